@@ -0,0 +1,78 @@
+"""
+Stress benchmark of the already-initialized read path under threads.
+
+Compares `Config.local()` and `Config.config()` (lock-free fast paths; a
+declaration registers the variable with a single dict store) with the same
+calls wrapped in the config lock, for a growing number of threads:
+
+    PYTHONPATH=. python benchmarks/initialized_path.py
+"""
+
+import argparse
+import sys
+import threading
+import time
+import types
+
+import configvars
+
+CALLS_PER_THREAD = 200_000
+
+
+def local(cfg, key):
+    return cfg.local(key)
+
+
+def declare(cfg, key):
+    return cfg.config(key, "default")
+
+
+def locked(read):
+    def locked_read(cfg, key):
+        with cfg._lock:
+            return read(cfg, key)
+
+    return locked_read
+
+
+def measure(read, cfg, threads, calls):
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(calls):
+            read(cfg, "FOO")
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return threads * calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=CALLS_PER_THREAD)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    args = parser.parse_args()
+
+    sys.modules["benchproj"] = types.ModuleType("benchproj")
+    sys.modules["benchproj.local"] = types.ModuleType("benchproj.local")
+    sys.modules["benchproj.local"].FOO = "local"
+    cfg = configvars.Config()
+    cfg.initialize(local_settings_module="benchproj.local")
+
+    print(f"{'call':>8} {'threads':>8} {'fast path ops/s':>18} {'locked ops/s':>18}")
+    for name, read in (("local", local), ("config", declare)):
+        for threads in args.threads:
+            fast = measure(read, cfg, threads, args.calls)
+            slow = measure(locked(read), cfg, threads, args.calls)
+            print(f"{name:>8} {threads:>8} {fast:>18,.0f} {slow:>18,.0f}")
+
+
+if __name__ == "__main__":
+    main()
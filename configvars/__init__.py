@@ -1,178 +1,1022 @@
-import dataclasses
-import importlib
-import logging
+import _thread
+import itertools
 import os
-import typing
-
-from django.core.exceptions import ImproperlyConfigured
 
 __all__ = [
     "initialize",
     "config",
     "as_bool",
     "as_list",
+    "as_tuple",
+    "as_json",
+    "freeze",
     "secret",
+    "aconfig",
+    "asecret",
     "get_config_variables",
 ]
 
 DEFAULT_LOCAL_SETTINGS_MODULE_NAME = "local"
+PROFILE_ENV_VAR = "CONFIGVARS_PROFILE"
+PAYLOAD_ENV_VAR = "CONFIGVARS_PAYLOAD"
+PAYLOAD_FD_ENV_VAR = "CONFIGVARS_PAYLOAD_FD"
 default_app_config = "configvars.apps.ConfigVarsAppConfig"
 
-
-log = logging.getLogger("configvars")
 _MISSING = object()
 MASKED_SECRET_VALUE = "*****"
 MAX_SECRET_FILE_SIZE = 64 * 1024
+MMAP_SECRET_FILE_THRESHOLD = 64 * 1024
+
+
+def __getattr__(name):
+    # Django and logging are imported on first use to keep `import configvars`
+    # cheap for short-lived processes.
+    if name == "ImproperlyConfigured":
+        from django.core.exceptions import ImproperlyConfigured
+
+        return ImproperlyConfigured
+    if name == "log":
+        import logging
+
+        return logging.getLogger("configvars")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _improperly_configured(message):
+    from django.core.exceptions import ImproperlyConfigured
+
+    return ImproperlyConfigured(message)
 
 
-@dataclasses.dataclass
 class ConfigVariable:
-    name: str
-    value: typing.Any = None
-    desc: str = ""
-    default: typing.Any = None
-    secret: bool = False
+    __slots__ = (
+        "name",
+        "value",
+        "desc",
+        "default",
+        "secret",
+        "file_var",
+        "dynamic",
+        "source",
+        "digest",
+        "aliases",
+        "interpolate",
+    )
+
+    def __init__(
+        self,
+        name,
+        value=None,
+        desc="",
+        default=None,
+        secret=False,
+        file_var=None,
+        dynamic=False,
+        source=None,
+        digest=None,
+        aliases=(),
+        interpolate=False,
+    ):
+        self.name = name
+        self.value = value
+        self.desc = desc
+        self.default = default
+        self.secret = secret
+        self.file_var = file_var
+        self.dynamic = dynamic
+        self.source = source
+        self.digest = digest
+        self.aliases = aliases
+        self.interpolate = interpolate
+
+    def _astuple(self):
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __repr__(self):
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}" for field in self.__slots__
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+
+class Registry:
+    """
+    Insertion-ordered mapping of config variables with O(1) snapshots.
+
+    A snapshot freezes the current writable layer and shares all frozen
+    layers with the returned registry; later writes go to a new top layer,
+    so neither side ever copies or sees the other's changes. Writes take
+    no lock, so take snapshots while no other thread registers variables
+    (e.g. between tests).
+    """
+
+    __slots__ = ("_frozen", "_top")
+
+    def __init__(self, frozen=()):
+        self._frozen = frozen
+        self._top = {}
+
+    def snapshot(self):
+        if self._top:
+            self._frozen = self._frozen + (self._top,)
+            self._top = {}
+        return Registry(self._frozen)
+
+    def get(self, key, default=None):
+        if key in self._top:
+            return self._top[key]
+        for layer in reversed(self._frozen):
+            if key in layer:
+                return layer[key]
+        return default
+
+    def __getitem__(self, key):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        self._top[key] = value
+
+    def __contains__(self, key):
+        return self.get(key, _MISSING) is not _MISSING
+
+    def _merged(self):
+        if not self._frozen:
+            return self._top
+        merged = {}
+        for layer in self._frozen + (self._top,):
+            merged.update(layer)
+        return merged
+
+    def __iter__(self):
+        return iter(self._merged())
+
+    def __len__(self):
+        return len(self._merged())
+
+    def values(self):
+        return self._merged().values()
+
+    def items(self):
+        return self._merged().items()
 
 
 class Config:
+    _STATE_ATTRS = (
+        "_local_settings_module",
+        "_env_prefix",
+        "_fallback_prefixes",
+        "_env_index",
+        "_all_configvars",
+        "_local_layers",
+        "_local_values",
+        "_remote",
+        "_values",
+        "_payload_files",
+        "_payload_names",
+        "_payload_withheld",
+        "_payload_imported",
+        "_secret_reads",
+        "_secret_hashes",
+        "_deprecated",
+        "_import_module_failed",
+        "_initialized",
+    )
+
     def __init__(self):
+        self._lock = _thread.RLock()
+        # next() of a count is atomic, so racing registrations never reuse
+        # a generation and cached metrics always notice a change
+        self._generations = itertools.count(1)
+        self._generation = 0
+        self._usage_writer = None
+        # keys digests of secrets, so they can't be checked against guesses
+        # outside this process
+        self._digest_key = os.urandom(32)
         self._reset_state()
 
     def _reset_state(self):
         self._local_settings_module = None
         self._env_prefix = None
-        self._all_configvars = {}
-        self._local = None
+        self._fallback_prefixes = ()
+        self._env_index = {}
+        self._all_configvars = Registry()
+        self._local_layers = []
+        self._local_values = {}
+        self._remote = {}
+        self._values = {}
+        self._payload_files = {}
+        self._payload_names = None
+        self._payload_withheld = frozenset()
+        self._payload_imported = False
+        self._interpolator = None
         self._import_module_failed = False
         self._initialized = False
+        self._inflight = {}
+        self._usage = None
+        if self._usage_writer is not None:
+            self._usage_writer.stop()
+        self._usage_writer = None
+        self._secret_reads = {}
+        self._secret_hashes = {}
+        self._deprecated = {}
+        self._generation = next(self._generations)
 
     @property
     def ENV_PREFIX(self):
         return self._env_prefix or ""
 
-    def initialize(self, local_settings_module=None, env_prefix=None):
+    def initialize(
+        self,
+        local_settings_module=None,
+        env_prefix=None,
+        providers=None,
+        profile=None,
+        fallback_prefixes=None,
+    ):
+        with self._lock:
+            self._initialize(
+                local_settings_module, env_prefix, providers, profile, fallback_prefixes
+            )
+
+    def _ensure_initialized(self):
+        # `_initialized` is set last, so threads which see it set skip the lock
+        with self._lock:
+            if not self._initialized:
+                self._initialize()
+
+    def _initialize(
+        self,
+        local_settings_module=None,
+        env_prefix=None,
+        providers=None,
+        profile=None,
+        fallback_prefixes=None,
+    ):
         self._initialized = False
         self._import_module_failed = False
-        self._all_configvars = {}
-        self._local = None
+        self._all_configvars = Registry()
+        self._local_layers = []
+        self._local_values = {}
+        self._remote = {}
+        self._values = {}
+        self._payload_files = {}
+        self._payload_names = None
+        self._payload_withheld = frozenset()
+        self._payload_imported = False
+        self._interpolator = None
+        self._secret_reads = {}
+        self._secret_hashes = {}
+        self._deprecated = {}
+        self._generation = next(self._generations)
+
+        # single use, so processes started by the child don't trust it
+        payload = os.environ.pop(PAYLOAD_ENV_VAR, None)
+        if payload:
+            self._load_payload(payload)
+            self._initialized = True
+            return
 
         self._env_prefix = env_prefix
+        self._index_env(fallback_prefixes or ())
+
+        for provider in providers or ():
+            self._remote.update(provider.fetch())
 
         if not local_settings_module:
             settings_module = os.getenv("DJANGO_SETTINGS_MODULE")
             if not settings_module:
-                raise ImproperlyConfigured(
+                raise _improperly_configured(
                     "DJANGO_SETTINGS_MODULE environment variable is not set."
                 )
             base_path = settings_module.split(".")[:-1]
             base_path.append(DEFAULT_LOCAL_SETTINGS_MODULE_NAME)
-            self._local_settings_module = ".".join(base_path)
+            modules = [".".join(base_path)]
+        elif isinstance(local_settings_module, (list, tuple)):
+            modules = list(local_settings_module)
         else:
-            self._local_settings_module = local_settings_module
+            modules = [local_settings_module]
+        self._local_settings_module = modules[0]
+
+        profile = profile or os.getenv(PROFILE_ENV_VAR)
+        if profile:
+            modules.append(f"{modules[0]}_{profile}")
+
+        # merged once, so every lookup is a single dict access
+        values = {key: (value, "remote") for key, value in self._remote.items()}
+        for index, module_name in enumerate(modules):
+            required = bool(local_settings_module) or index > 0
+            module = self._import_local_module(module_name, required)
+            if module is None:
+                continue
+            self._local_layers.append(module_name)
+            for key, value in vars(module).items():
+                if not key.startswith("__"):
+                    self._local_values[key] = value
+                    values[key] = (value, module_name)
+        self._values = values
+        self._initialized = True
+
+    def _load_payload(self, data):
+        import json
+
+        payload = json.loads(data)
+        self._env_prefix = payload["env_prefix"]
+        self._index_env(payload["fallback_prefixes"])
+        self._local_settings_module = payload["local_settings_module"]
+        self._local_layers = payload["local_layers"]
+        self._payload_names = frozenset(payload["names"])
+        self._payload_withheld = frozenset(payload["withheld"])
+        values = payload["values"]
+
+        fd = os.environ.pop(PAYLOAD_FD_ENV_VAR, None)
+        if fd:
+            data = _read_payload_fd(int(fd))
+            try:
+                secrets = json.loads(data)
+                secret_values, payload_files = secrets["values"], secrets["files"]
+            except (ValueError, KeyError) as exc:
+                # e.g. a pipe already drained by another child process
+                raise _improperly_configured(
+                    f"Config payload from file descriptor {fd} is empty or "
+                    f"invalid. A pipe can be read by one child process only."
+                ) from exc
+            values.update(secret_values)
+            self._payload_files = payload_files
+
+        for key, (value, source) in values.items():
+            if source == "remote":
+                self._remote[key] = value
+            else:
+                self._local_values[key] = value
+            self._values[key] = (value, source)
+
+    def _index_env(self, fallback_prefixes):
+        # built once, so every name a variable accepts (aliases, names under
+        # fallback prefixes) is found with one dict access; the primary
+        # prefix takes precedence, then fallback prefixes in order. Only the
+        # current name is read live: old names, including aliases under the
+        # primary prefix, are a snapshot until the next `initialize()`
+        self._fallback_prefixes = tuple(fallback_prefixes)
+        self._env_index = {}
+        for prefix in reversed((self.ENV_PREFIX,) + self._fallback_prefixes):
+            for name, value in os.environ.items():
+                if name.startswith(prefix):
+                    self._env_index[name[len(prefix) :]] = (name, value)
+
+    def _import_local_module(self, module_name, required):
+        from importlib import import_module
 
         try:
-            self._local = importlib.import_module(self._local_settings_module)
+            return import_module(module_name)
         except AttributeError as exc:
-            raise ImproperlyConfigured(
+            raise _improperly_configured(
                 "Ensure that `local_settings_module` argument of `initialize()` "
                 "is a string containing a dotted module path."
             ) from exc
         except ImportError as exc:
-            if local_settings_module:  # if provided explicite
-                raise ImproperlyConfigured(
-                    f"Can't import local settings module " f"{local_settings_module}"
+            if required:
+                raise _improperly_configured(
+                    f"Can't import local settings module {module_name}"
                 ) from exc
-            else:
-                self._local = object()
-                self._import_module_failed = self._local_settings_module
-                self._initialized = True
-        else:
-            # backward compatibility
-            self._initialized = True
+            self._import_module_failed = module_name
+            return None
 
     def local(self, key, default=None):
         if not self._initialized:
-            self.initialize()
-        return getattr(self._local, key, default)
+            self._ensure_initialized()
+        return self._local_values.get(key, default)
 
     def env(self, key, default=None):
         if not self._initialized:
-            self.initialize()
-        return os.getenv(f"{self.ENV_PREFIX}{key}", default)
+            self._ensure_initialized()
+        value = os.getenv(f"{self.ENV_PREFIX}{key}", _MISSING)
+        if value is _MISSING:
+            value = self._deprecated_env(key, ())
+        return default if value is _MISSING else value
 
-    def config(self, key, default=None, desc=None):
+    def remote(self, key, default=None):
         if not self._initialized:
-            self.initialize()
-        value = self.env(key, self.local(key, default))
-        self._all_configvars[key] = ConfigVariable(
-            name=key, desc=desc, value=value, default=default
+            self._ensure_initialized()
+        return self._remote.get(key, default)
+
+    def _resolve(self, key, default, aliases=()):
+        """Return `(value, source)` with ENV > LOCAL > REMOTE > DEFAULT."""
+        value = os.getenv(f"{self.ENV_PREFIX}{key}", _MISSING)
+        if value is not _MISSING:
+            return value, "env"
+        if aliases or self._fallback_prefixes:
+            value = self._deprecated_env(key, aliases)
+            if value is not _MISSING:
+                return value, "env"
+        if self._payload_names is not None and key not in self._payload_names:
+            self._resolve_outside_payload(key)
+        if key in self._values or not aliases:
+            return self._values.get(key, (default, "default"))
+        for alias in aliases:
+            if alias in self._values:
+                self._record_deprecated(alias, key)
+                return self._values[alias]
+        return default, "default"
+
+    def _resolve_outside_payload(self, key):
+        if key in self._payload_withheld:
+            raise _improperly_configured(
+                f"Remote value of secret `{key}` was not exported to this process. "
+                "Use `export_environment(include_secrets=True)`."
+            )
+        # e.g. a value which is not JSON, a secret left out of the payload or
+        # a variable declared only here: import the local settings modules
+        with self._lock:
+            if self._payload_imported:
+                return
+            # new dicts, as snapshots may share the current ones
+            local_values = dict(self._local_values)
+            values = dict(self._values)
+            for module_name in self._local_layers:
+                module = self._import_local_module(module_name, True)
+                for name, value in vars(module).items():
+                    if not name.startswith("__"):
+                        local_values[name] = value
+                        values[name] = (value, module_name)
+            self._local_values = local_values
+            self._values = values
+            self._payload_imported = True
+
+    def _record_deprecated(self, old, new):
+        # copied on write, so snapshots which share the dict are not changed
+        with self._lock:
+            if self._deprecated.get(old) != new:
+                self._deprecated = {**self._deprecated, old: new}
+
+    def _deprecated_env(self, key, aliases):
+        new_name = f"{self.ENV_PREFIX}{key}"
+        for name in (key,) + tuple(aliases):
+            entry = self._env_index.get(name)
+            # the current name is read from the environment by the caller
+            if entry is not None and entry[0] != new_name:
+                self._record_deprecated(entry[0], new_name)
+                return entry[1]
+        return _MISSING
+
+    def _lookup(self, key, default):
+        return self._resolve(key, default)[0]
+
+    def deprecated_names(self):
+        """
+        Return `{old: new}` of deprecated names (aliases or names under
+        fallback prefixes) which provided values.
+        """
+        with self._lock:
+            return dict(self._deprecated)
+
+    def config(
+        self,
+        key,
+        default=None,
+        desc=None,
+        interpolate=False,
+        dynamic=False,
+        aliases=None,
+    ):
+        if not self._initialized:
+            self._ensure_initialized()
+        aliases = tuple(aliases or ())
+        value, source = self._resolve(key, default, aliases)
+        registry_value = value
+        if interpolate:
+            value, registry_value = self._interpolate(key, value)
+        self._register(
+            ConfigVariable(
+                name=key,
+                desc=desc,
+                value=registry_value,
+                default=default,
+                dynamic=dynamic,
+                source=source,
+                aliases=aliases,
+                interpolate=interpolate,
+            )
         )
         return value
 
+    def _register(self, var):
+        # a single dict store, so the initialized path takes no lock
+        self._all_configvars[var.name] = var
+        self._generation = next(self._generations)
+
+    def _interpolate(self, key, raw):
+        with self._lock:
+            if self._interpolator is None:
+                from .interpolation import Interpolator
+
+                self._interpolator = Interpolator(self._reference, self._expands)
+            value, dependencies = self._interpolator.resolve(key, raw)
+        registry_value = value
+        for name in dependencies:
+            var = self._all_configvars.get(name)
+            if var is not None and var.secret:
+                registry_value = MASKED_SECRET_VALUE
+                break
+        return value, registry_value
+
+    def _expands(self, key):
+        var = self._all_configvars.get(key)
+        return var is not None and var.interpolate
+
+    def _reference(self, key):
+        value = self._lookup(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        var = self._all_configvars.get(key)
+        if var is None:
+            raise _improperly_configured(
+                f"Referenced config variable `{key}` is not defined."
+            )
+        path = var.file_var and self._lookup(var.file_var, None)
+        if var.secret and path:
+            # the registry keeps only the masked value, so read the file again
+            if var.file_var in self._payload_files:
+                return self._decode_payload_file(key, var.file_var, True, False, None)
+            return self._read_secret_file(key, path, True, False, None)
+        return var.default
+
     def secret(
-        self, key=None, default=None, desc=None, file_var=None, allow_multiline=False
+        self,
+        key=None,
+        default=None,
+        desc=None,
+        file_var=None,
+        allow_multiline=None,
+        binary=False,
+        max_size=None,
+        aliases=None,
     ):
         if not self._initialized:
-            self.initialize()
+            self._ensure_initialized()
+        aliases = tuple(aliases or ())
+        if allow_multiline is None:
+            # line breaks are meaningful in binary content (DER, keystores)
+            allow_multiline = binary
 
         if key is None and file_var is None:
-            raise ImproperlyConfigured("Provide `key` or `file_var` to `secret()`.")
+            raise _improperly_configured("Provide `key` or `file_var` to `secret()`.")
 
         secret_name = key or file_var
         value = _MISSING
         file_value = _MISSING
 
         if key is not None:
-            value = self.env(key, self.local(key, _MISSING))
+            value, value_source = self._resolve(key, _MISSING, aliases)
         if file_var is not None:
-            file_value = self.env(file_var, self.local(file_var, _MISSING))
+            file_value, file_source = self._resolve(file_var, _MISSING)
 
         if value is not _MISSING and file_value is not _MISSING:
-            raise ImproperlyConfigured(
+            raise _improperly_configured(
                 f"Set only one of `{key}` or `{file_var}` for secret `{secret_name}`."
             )
 
         resolved_value = default
+        source = "default"
         if file_value is not _MISSING:
+            source = file_source
             if not file_value:
                 resolved_value = file_value
+            elif file_var in self._payload_files:
+                resolved_value = self._decode_payload_file(
+                    secret_name, file_var, allow_multiline, binary, max_size
+                )
             else:
-                if not os.path.isfile(file_value):
-                    raise ImproperlyConfigured(
-                        f"Secret file for `{secret_name}` does not exist: {file_value}"
-                    )
-                if os.path.getsize(file_value) > MAX_SECRET_FILE_SIZE:
-                    raise ImproperlyConfigured(
-                        f"Secret file for `{secret_name}` is too large: {file_value}"
-                    )
-                with open(file_value) as f:
-                    resolved_value = f.read()
-                if not allow_multiline and any(
-                    char in resolved_value for char in ("\n", "\r")
-                ):
-                    raise ImproperlyConfigured(
-                        f"Secret file for `{secret_name}` must be single-line."
-                    )
+                resolved_value = self._read_secret_file(
+                    secret_name, file_value, allow_multiline, binary, max_size
+                )
         elif value is not _MISSING:
+            source = value_source
             resolved_value = value
+            if binary and isinstance(resolved_value, str):
+                resolved_value = resolved_value.encode()
+            if binary and isinstance(resolved_value, bytes):
+                resolved_value = memoryview(resolved_value)
 
         registry_value = resolved_value
-        if registry_value not in (None, ""):
+        digest = None
+        if registry_value not in (None, "", b""):
             registry_value = MASKED_SECRET_VALUE
+            digest = _digest(resolved_value, self._digest_key)
+            value_hash = bytes.fromhex(_digest(resolved_value))
+            self._secret_hashes = {**self._secret_hashes, secret_name: value_hash}
 
-        self._all_configvars[secret_name] = ConfigVariable(
-            name=secret_name,
-            desc=desc,
-            default=default,
-            value=registry_value,
-            secret=True,
+        self._register(
+            ConfigVariable(
+                name=secret_name,
+                desc=desc,
+                default=default,
+                value=registry_value,
+                secret=True,
+                file_var=file_var,
+                source=source,
+                digest=digest,
+                aliases=aliases,
+            )
         )
 
         return resolved_value
 
+    async def aconfig(
+        self,
+        key,
+        default=None,
+        desc=None,
+        interpolate=False,
+        dynamic=False,
+        aliases=None,
+    ):
+        return await self._resolve_in_executor(
+            self.config,
+            key,
+            default,
+            desc,
+            interpolate,
+            dynamic,
+            tuple(aliases) if aliases else None,
+        )
+
+    async def asecret(
+        self,
+        key=None,
+        default=None,
+        desc=None,
+        file_var=None,
+        allow_multiline=None,
+        binary=False,
+        max_size=None,
+        aliases=None,
+    ):
+        return await self._resolve_in_executor(
+            self.secret,
+            key,
+            default,
+            desc,
+            file_var,
+            allow_multiline,
+            binary,
+            max_size,
+            tuple(aliases) if aliases else None,
+        )
+
+    async def _resolve_in_executor(self, resolve, *args):
+        """
+        Run blocking `resolve(*args)` in the default executor.
+
+        Concurrent calls with the same arguments share a single in-flight
+        resolution (and its result or exception).
+        """
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        # types are part of the key, so e.g. defaults 1, 1.0 and True
+        # are not collapsed into one request
+        request = (loop, resolve.__name__) + tuple((type(arg), arg) for arg in args)
+        try:
+            future = self._inflight.get(request)
+        except TypeError:
+            return await loop.run_in_executor(None, resolve, *args)
+
+        if future is None:
+            future = loop.run_in_executor(None, resolve, *args)
+            self._inflight[request] = future
+            future.add_done_callback(lambda _: self._inflight.pop(request, None))
+        return await asyncio.shield(future)
+
+    def _read_secret_file(self, secret_name, path, allow_multiline, binary, max_size):
+        if max_size is None:
+            max_size = MAX_SECRET_FILE_SIZE
+        if not os.path.isfile(path):
+            raise _improperly_configured(
+                f"Secret file for `{secret_name}` does not exist: {path}"
+            )
+
+        import time
+
+        started = time.perf_counter()
+        with open(path, "rb" if binary else "r") as f:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            if size > max_size:
+                raise _improperly_configured(
+                    f"Secret file for `{secret_name}` is too large: {path}"
+                )
+            if binary and size >= MMAP_SECRET_FILE_THRESHOLD:
+                import mmap
+
+                content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                content = f.read()
+        self._secret_reads = {
+            **self._secret_reads,
+            secret_name: (time.perf_counter() - started, stat.st_mtime),
+        }
+        return self._checked_secret(secret_name, content, allow_multiline, binary)
+
+    def _decode_payload_file(
+        self, secret_name, file_var, allow_multiline, binary, max_size
+    ):
+        import base64
+
+        if max_size is None:
+            max_size = MAX_SECRET_FILE_SIZE
+        content = base64.b64decode(self._payload_files[file_var])
+        if len(content) > max_size:
+            raise _improperly_configured(
+                f"Secret file for `{secret_name}` is too large."
+            )
+        if not binary:
+            import io
+
+            content = io.TextIOWrapper(io.BytesIO(content)).read()
+        return self._checked_secret(secret_name, content, allow_multiline, binary)
+
+    def _checked_secret(self, secret_name, content, allow_multiline, binary):
+        if not allow_multiline and _has_line_break(content):
+            raise _improperly_configured(
+                f"Secret file for `{secret_name}` must be single-line."
+            )
+        if binary:
+            # one type regardless of size: small files are wrapped, large
+            # ones are mapped; both are read-only
+            return memoryview(content)
+        return content
+
+    def export_environment(self, include_secrets=False):
+        """
+        Return environment variables which let child processes skip
+        `initialize()` work.
+
+        Resolved local and remote values of registered variables are passed
+        as compact JSON in `CONFIGVARS_PAYLOAD`; `initialize()` in a child
+        trusts it instead of importing local settings modules or fetching
+        remote values. Values which are not JSON are left out, and the child
+        imports local settings modules when it needs them. Secret values are
+        left out unless `include_secrets` is set: then they and the contents
+        of secret files are written to an in-memory file (or a pipe) whose
+        inheritable descriptor is passed in `CONFIGVARS_PAYLOAD_FD`. Pass
+        that descriptor to children (e.g. with `pass_fds`) and close it once
+        they are started.
+        """
+        import json
+
+        if not self._initialized:
+            self._ensure_initialized()
+        variables = list(self._all_configvars.values())
+        secret_names = {var.name for var in variables if var.secret}
+        names = {var.name for var in variables}
+        names.update(var.file_var for var in variables if var.file_var)
+
+        values = self._exported_values(names - secret_names)
+        secret_values = self._exported_values(secret_names) if include_secrets else {}
+        payload = {
+            "env_prefix": self._env_prefix,
+            "fallback_prefixes": self._fallback_prefixes,
+            "local_settings_module": self._local_settings_module,
+            "local_layers": self._local_layers,
+            # names the child can resolve without local settings modules
+            "names": sorted(
+                name
+                for name in names
+                if name in values or name in secret_values or name not in self._values
+            ),
+            "withheld": sorted(
+                name
+                for name in secret_names - secret_values.keys()
+                if self._values.get(name, (None, None))[1] == "remote"
+            ),
+            "values": values,
+        }
+        environ = {PAYLOAD_ENV_VAR: json.dumps(payload, separators=(",", ":"))}
+
+        if include_secrets:
+            secrets = {
+                "values": secret_values,
+                "files": self._exported_files(variables),
+            }
+            fd = _write_payload_fd(json.dumps(secrets, separators=(",", ":")))
+            environ[PAYLOAD_FD_ENV_VAR] = str(fd)
+        return environ
+
+    def _exported_values(self, names):
+        import json
+
+        values = {}
+        for key in sorted(names):
+            if key not in self._values:
+                continue
+            value, source = self._values[key]
+            try:
+                exportable = json.loads(json.dumps(value)) == value
+            except (TypeError, ValueError):
+                exportable = False
+            # e.g. tuples, which would come back as lists
+            if exportable:
+                values[key] = (value, source)
+        return values
+
+    def _exported_files(self, variables):
+        import base64
+
+        files = {}
+        for var in variables:
+            if not (var.secret and var.file_var):
+                continue
+            path = self._lookup(var.file_var, None)
+            if path:
+                with open(path, "rb") as f:
+                    files[var.file_var] = base64.b64encode(f.read()).decode()
+        return files
+
+    def snapshot(self):
+        """
+        Capture the internal state in O(1); pass the token to `restore()`.
+        """
+        with self._lock:
+            state = {attr: getattr(self, attr) for attr in self._STATE_ATTRS}
+            state["_all_configvars"] = self._all_configvars.snapshot()
+        return state
+
+    def restore(self, token):
+        with self._lock:
+            for attr, value in token.items():
+                setattr(self, attr, value)
+            self._all_configvars = token["_all_configvars"].snapshot()
+            self._interpolator = None
+            self._inflight = {}
+            self._generation = next(self._generations)
+
     def config_variables(self):
         return self._all_configvars.values()
 
+    def secret_file_reads(self):
+        """Return `{name: (seconds, mtime)}` of secret files read so far."""
+        return dict(self._secret_reads)
+
+    def secret_digest(self, name, key):
+        """
+        Return an HMAC-SHA256 hex digest of the value of secret `name` keyed
+        with `key`, or None if the secret has no value.
+        """
+        import hashlib
+        import hmac
+
+        value_hash = self._secret_hashes.get(name)
+        if value_hash is None:
+            return None
+        return hmac.new(key, value_hash, hashlib.sha256).hexdigest()
+
+    def fingerprint(self, key=None):
+        """
+        Return a digest of names, sources and values of all variables.
+
+        Secrets contribute only their `secret_digest()` with `key`, by default
+        derived from `CONFIGVARS_FINGERPRINT_KEY` or `SECRET_KEY`, so processes
+        with the same settings report the same fingerprint.
+        """
+        import hashlib
+
+        if key is None:
+            key = self._fingerprint_key()
+        fingerprint = hashlib.sha256()
+        for var in sorted(self._all_configvars.values(), key=lambda var: var.name):
+            digest = var.secret and self.secret_digest(var.name, key)
+            digest = digest or _digest(var.value)
+            fingerprint.update(f"{var.name}\0{var.source}\0{digest}\n".encode())
+        return fingerprint.hexdigest()
+
+    def _fingerprint_key(self):
+        key = None
+        try:
+            from django.conf import settings
+        except ImportError:
+            settings = None
+        if settings is not None and settings.configured:
+            from django.core.exceptions import ImproperlyConfigured
+
+            key = getattr(settings, "CONFIGVARS_FINGERPRINT_KEY", None)
+            try:
+                key = key or settings.SECRET_KEY
+            except ImproperlyConfigured:
+                # raised for an empty SECRET_KEY
+                pass
+        if not key:
+            # without settings, secrets are keyed for this process only
+            return self._digest_key
+        if isinstance(key, str):
+            key = key.encode()
+        return bytes.fromhex(_digest(b"configvars.fingerprint", key))
+
+    def enable_usage_tracking(self, directory=None, interval=None):
+        """
+        Count reads of registered variables. With `directory`, counts of
+        this process are also written there periodically and at exit, so
+        `manage.py configvars --usage` can report them.
+        """
+        with self._lock:
+            if self._usage is None:
+                from .usage import UsageCounter
+
+                self._usage = UsageCounter()
+            if directory and self._usage_writer is None:
+                from .usage import DEFAULT_WRITE_INTERVAL, UsageWriter
+
+                self._usage_writer = UsageWriter(
+                    self._usage, directory, interval or DEFAULT_WRITE_INTERVAL
+                )
+                self._usage_writer.start()
+
+    def record_access(self, key):
+        if self._usage is not None and key in self._all_configvars:
+            self._usage.record(key)
+
+    def usage(self):
+        if self._usage is None:
+            return None
+        counts = self._usage.counts()
+        return {key: counts.get(key, 0) for key in self._all_configvars}
+
+    def unknown_env_variables(self, max_suggestions=3):
+        from .typos import find_unknown_env_variables
+
+        return find_unknown_env_variables(self, max_suggestions=max_suggestions)
+
+
+def _digest(value, key=None):
+    """Return a SHA-256 hex digest of `value`, an HMAC if `key` is given."""
+    import hashlib
+    import hmac
+
+    if isinstance(value, str):
+        value = value.encode()
+    else:
+        try:
+            value = memoryview(value)
+        except TypeError:
+            value = repr(value).encode()
+    if key is not None:
+        return hmac.new(key, value, hashlib.sha256).hexdigest()
+    return hashlib.sha256(value).hexdigest()
+
+
+def _write_payload_fd(data):
+    # secrets never touch the disk: an anonymous in-memory file where
+    # available, otherwise a pipe written by a background thread
+    data = data.encode()
+    memfd_create = getattr(os, "memfd_create", None)
+    if memfd_create is not None:
+        fd = memfd_create("configvars-payload")
+        with open(fd, "wb", closefd=False) as f:
+            f.write(data)
+    else:
+        import threading
+
+        fd, write_fd = os.pipe()
+
+        def write():
+            with open(write_fd, "wb") as f:
+                f.write(data)
+
+        threading.Thread(target=write, name="configvars-payload", daemon=True).start()
+    os.set_inheritable(fd, True)
+    return fd
+
+
+def _read_payload_fd(fd):
+    import stat
+
+    try:
+        if stat.S_ISREG(os.fstat(fd).st_mode):
+            # positional, so children sharing the descriptor all read it whole
+            data = os.pread(fd, os.fstat(fd).st_size, 0)
+        else:
+            with open(fd, "rb", closefd=False) as f:
+                data = f.read()
+        os.close(fd)
+    except OSError as exc:
+        raise _improperly_configured(
+            f"Can't read config payload from file descriptor {fd}."
+        ) from exc
+    return data
+
+
+def _has_line_break(content):
+    if isinstance(content, str):
+        return "\n" in content or "\r" in content
+    return content.find(b"\n") != -1 or content.find(b"\r") != -1
+
 
 def as_list(value, separator=","):
     if value:
@@ -184,6 +1028,51 @@ def as_list(value, separator=","):
         return []
 
 
+def freeze(value):
+    """
+    Return an immutable equivalent of `value`: lists and tuples become tuples,
+    sets become frozensets and dicts become read-only mappings (recursively).
+    """
+    if isinstance(value, dict):
+        from types import MappingProxyType
+
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze(item) for item in value)
+    return value
+
+
+_frozen_values = {}
+
+
+def _frozen_cast(kind, raw, parse):
+    # results are shared between all casts of the same raw string
+    key = (kind, type(raw), raw)
+    try:
+        return _frozen_values[key]
+    except KeyError:
+        return _frozen_values.setdefault(key, freeze(parse(raw)))
+
+
+def as_tuple(value, separator=","):
+    if not value:
+        return ()
+    if isinstance(value, (list, tuple)):
+        return freeze(value)
+    return _frozen_cast(("split", separator), value, lambda raw: raw.split(separator))
+
+
+def as_json(value):
+    if not isinstance(value, (str, bytes)):
+        return freeze(value)
+
+    import json
+
+    return _frozen_cast("json", value, json.loads)
+
+
 def as_bool(value):
     if isinstance(value, bool):
         return value
@@ -200,23 +1089,89 @@ def as_bool(value):
 default_config = Config()
 
 
-def initialize(local_settings_module=None, env_prefix=None):
+def initialize(
+    local_settings_module=None,
+    env_prefix=None,
+    providers=None,
+    profile=None,
+    fallback_prefixes=None,
+):
     return default_config.initialize(
-        local_settings_module=local_settings_module, env_prefix=env_prefix
+        local_settings_module=local_settings_module,
+        env_prefix=env_prefix,
+        providers=providers,
+        profile=profile,
+        fallback_prefixes=fallback_prefixes,
     )
 
 
-def config(var, default=None, desc=None):
-    return default_config.config(key=var, default=default, desc=desc)
+def config(
+    var, default=None, desc=None, interpolate=False, dynamic=False, aliases=None
+):
+    return default_config.config(
+        key=var,
+        default=default,
+        desc=desc,
+        interpolate=interpolate,
+        dynamic=dynamic,
+        aliases=aliases,
+    )
 
 
-def secret(var=None, default=None, desc=None, file_var=None, allow_multiline=False):
+def secret(
+    var=None,
+    default=None,
+    desc=None,
+    file_var=None,
+    allow_multiline=None,
+    binary=False,
+    max_size=None,
+    aliases=None,
+):
     return default_config.secret(
         key=var,
         default=default,
         desc=desc,
         file_var=file_var,
         allow_multiline=allow_multiline,
+        binary=binary,
+        max_size=max_size,
+        aliases=aliases,
+    )
+
+
+async def aconfig(
+    var, default=None, desc=None, interpolate=False, dynamic=False, aliases=None
+):
+    return await default_config.aconfig(
+        key=var,
+        default=default,
+        desc=desc,
+        interpolate=interpolate,
+        dynamic=dynamic,
+        aliases=aliases,
+    )
+
+
+async def asecret(
+    var=None,
+    default=None,
+    desc=None,
+    file_var=None,
+    allow_multiline=None,
+    binary=False,
+    max_size=None,
+    aliases=None,
+):
+    return await default_config.asecret(
+        key=var,
+        default=default,
+        desc=desc,
+        file_var=file_var,
+        allow_multiline=allow_multiline,
+        binary=binary,
+        max_size=max_size,
+        aliases=aliases,
     )
 
 
@@ -21,8 +21,71 @@ def check_local_settings(app_configs, **kwargs):
     return errors
 
 
+def check_unknown_env_variables(app_configs, **kwargs):
+    from . import default_config
+
+    errors = []
+    for var in default_config.unknown_env_variables():
+        hint = None
+        if var.suggestions:
+            hint = f"Did you mean {', '.join(var.suggestions)}?"
+        errors.append(
+            Warning(
+                f"Environment variable `{var.name}` does not match any "
+                f"registered config variable.",
+                hint=hint,
+            )
+        )
+    return errors
+
+
+def deprecated_names_message(names):
+    renames = ", ".join(f"`{old}` -> `{new}`" for old, new in sorted(names.items()))
+    return f"Deprecated config variable names are used: {renames}."
+
+
+def check_deprecated_names(app_configs, **kwargs):
+    from . import default_config
+
+    names = default_config.deprecated_names()
+    if not names:
+        return []
+    return [
+        Warning(
+            deprecated_names_message(names),
+            hint="Rename them to the new names.",
+        )
+    ]
+
+
 class ConfigVarsAppConfig(AppConfig):
     name = "configvars"
 
     def ready(self):
         register(check_local_settings)
+        register(check_unknown_env_variables)
+        register(check_deprecated_names)
+
+        from django.conf import settings
+
+        from . import default_config, log
+
+        # checks don't run in workers, so the settings' deprecated names are
+        # logged once as well
+        deprecated = default_config.deprecated_names()
+        if deprecated:
+            log.warning(deprecated_names_message(deprecated))
+
+        usage_dir = getattr(settings, "CONFIGVARS_USAGE_DIR", None)
+        if usage_dir:
+            default_config.enable_usage_tracking(
+                directory=usage_dir,
+                interval=getattr(settings, "CONFIGVARS_USAGE_INTERVAL", None),
+            )
+
+        history_file = getattr(settings, "CONFIGVARS_HISTORY_FILE", None)
+        if history_file:
+            from .history import record_in_background, should_record
+
+            if should_record():
+                record_in_background(default_config, history_file)
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from django.db import DatabaseError
+
+from .. import _improperly_configured, default_config, log
+
+__all__ = ["get", "DynamicOverrides"]
+
+default_app_config = "configvars.dynamic.apps.DynamicConfigVarsAppConfig"
+
+DEFAULT_TTL = 1.0
+
+
+class DynamicOverrides:
+    """
+    Runtime overrides of variables declared with `config(..., dynamic=True)`.
+
+    Overrides are kept in process memory. At most once per `ttl` seconds a
+    single query checks the overrides version, and overrides are reloaded
+    only when it has changed, so all workers see changes within `ttl`.
+    If the database is unavailable, the last loaded values are served.
+    """
+
+    def __init__(self, config, ttl=None):
+        self._config = config
+        self._ttl = ttl
+        self._values = {}
+        self._version = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def ttl(self):
+        if self._ttl is None:
+            from django.conf import settings
+
+            return getattr(settings, "CONFIGVARS_DYNAMIC_TTL", DEFAULT_TTL)
+        return self._ttl
+
+    def get(self, key):
+        var = self._config._all_configvars.get(key)
+        if var is None or not var.dynamic:
+            raise _improperly_configured(
+                f"Config variable `{key}` is not declared as dynamic."
+            )
+        if self._expired():
+            with self._lock:
+                # another thread may have refreshed while this one waited
+                if self._expired():
+                    try:
+                        self._refresh()
+                    except DatabaseError:
+                        log.warning(
+                            "Can't refresh dynamic config overrides", exc_info=True
+                        )
+                        # retry after `ttl` instead of querying on every call
+                        self._checked_at = time.monotonic()
+        return self._values.get(key, var.value)
+
+    def _expired(self):
+        checked_at = self._checked_at
+        return checked_at is None or time.monotonic() - checked_at >= self.ttl
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def _refresh(self):
+        from contextlib import nullcontext
+
+        from django.db import transaction
+
+        from .models import Override, OverridesVersion
+
+        # inside a transaction use a savepoint, so a failed query doesn't
+        # abort the caller's transaction (e.g. with ATOMIC_REQUESTS)
+        using = Override.objects.db
+        atomic = transaction.get_connection(using).in_atomic_block
+        with transaction.atomic(using=using) if atomic else nullcontext():
+            version = OverridesVersion.current()
+            if version != self._version:
+                names = [
+                    var.name for var in self._config.config_variables() if var.dynamic
+                ]
+                self._values = dict(
+                    Override.objects.filter(name__in=names).values_list("name", "value")
+                )
+                self._version = version
+        self._checked_at = time.monotonic()
+
+
+overrides = DynamicOverrides(default_config)
+
+
+def get(var):
+    return overrides.get(var)
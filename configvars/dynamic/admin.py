@@ -0,0 +1,9 @@
+from django.contrib import admin
+
+from .models import Override
+
+
+@admin.register(Override)
+class OverrideAdmin(admin.ModelAdmin):
+    list_display = ("name", "value", "updated_at")
+    search_fields = ("name",)
@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+def bump_overrides_version(sender, **kwargs):
+    from .models import OverridesVersion
+
+    OverridesVersion.bump()
+
+
+class DynamicConfigVarsAppConfig(AppConfig):
+    name = "configvars.dynamic"
+    label = "configvars_dynamic"
+    default_auto_field = "django.db.models.AutoField"
+
+    def ready(self):
+        from .models import Override
+
+        post_save.connect(bump_overrides_version, sender=Override)
+        post_delete.connect(bump_overrides_version, sender=Override)
@@ -0,0 +1,55 @@
+from django.db import models
+from django.db.models import F
+
+
+class OverrideQuerySet(models.QuerySet):
+    """
+    Bumps the overrides version on bulk writes, which send no `post_save`.
+    Raw SQL changes must call `OverridesVersion.bump()` themselves.
+    """
+
+    def update(self, **kwargs):
+        rows = super().update(**kwargs)
+        if rows:
+            OverridesVersion.bump()
+        return rows
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = super().bulk_create(objs, *args, **kwargs)
+        if objs:
+            OverridesVersion.bump()
+        return objs
+
+    def bulk_update(self, objs, *args, **kwargs):
+        objs = list(objs)
+        rows = super().bulk_update(objs, *args, **kwargs)
+        if objs:
+            OverridesVersion.bump()
+        return rows
+
+
+class Override(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    value = models.JSONField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = OverrideQuerySet.as_manager()
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class OverridesVersion(models.Model):
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def current(cls):
+        return cls.objects.filter(pk=1).values_list("value", flat=True).first() or 0
+
+    @classmethod
+    def bump(cls):
+        if not cls.objects.filter(pk=1).update(value=F("value") + 1):
+            cls.objects.get_or_create(pk=1, defaults={"value": 1})
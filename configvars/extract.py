@@ -0,0 +1,318 @@
+"""
+Static extraction of `config()` / `secret()` declarations.
+
+Parses settings modules (and project modules they import) without executing
+them. Usage::
+
+    python -m configvars.extract path/to/settings.py [--json] [--cache-dir DIR]
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import sys
+
+from . import MASKED_SECRET_VALUE, ConfigVariable
+
+CALL_ARGUMENTS = {
+    "config": ("var", "default", "desc", "interpolate", "dynamic", "aliases"),
+    "secret": (
+        "var",
+        "default",
+        "desc",
+        "file_var",
+        "allow_multiline",
+        "binary",
+        "max_size",
+        "aliases",
+    ),
+}
+
+# part of the cache key, so results of older parsers are not reused
+_PARSER_VERSION = b"2"
+
+_cache = {}
+
+
+class Expression:
+    """
+    A non-literal argument which is not evaluated, e.g. ``int(os.getenv("X"))``.
+
+    Its ``repr()`` is the source text, so it is distinguishable from a string
+    in listings.
+    """
+
+    __slots__ = ("source",)
+
+    def __init__(self, source):
+        self.source = source
+
+    def __eq__(self, other):
+        if not isinstance(other, Expression):
+            return NotImplemented
+        return self.source == other.source
+
+    def __hash__(self):
+        return hash(self.source)
+
+    def __repr__(self):
+        return self.source
+
+
+def _source(node, source):
+    segment = getattr(ast, "get_source_segment", None)
+    if segment is not None:
+        return segment(source, node)
+    # Python 3.7 has no source positions: literals are rebuilt and other
+    # expressions are kept as their AST dump
+    try:
+        return repr(ast.literal_eval(node))
+    except (ValueError, TypeError):
+        return ast.dump(node)
+
+
+def _evaluate(text):
+    if text is None:
+        return None
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        return Expression(text)
+
+
+def _configvars_bindings(tree):
+    functions = {}
+    modules = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ImportFrom) and node.module == "configvars":
+            for alias in node.names:
+                if alias.name in CALL_ARGUMENTS:
+                    functions[alias.asname or alias.name] = alias.name
+        elif isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.name == "configvars":
+                    modules.add(alias.asname or alias.name)
+    return functions, modules
+
+
+def _called_function(node, functions, modules):
+    func = node.func
+    if isinstance(func, ast.Name):
+        return functions.get(func.id)
+    if (
+        isinstance(func, ast.Attribute)
+        and isinstance(func.value, ast.Name)
+        and func.value.id in modules
+        and func.attr in CALL_ARGUMENTS
+    ):
+        return func.attr
+    return None
+
+
+def _string(node):
+    if sys.version_info < (3, 8):
+        return node.s if isinstance(node, ast.Str) else None
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _declaration(kind, node, source):
+    arguments = dict(zip(CALL_ARGUMENTS[kind], node.args))
+    for keyword in node.keywords:
+        if keyword.arg is not None:
+            arguments[keyword.arg] = keyword.value
+
+    var = _string(arguments["var"]) if "var" in arguments else None
+    file_var = _string(arguments["file_var"]) if "file_var" in arguments else None
+    if not (var or file_var):
+        return None
+
+    declaration = {"kind": kind, "name": var or file_var, "file_var": file_var}
+    for field in ("default", "desc", "interpolate", "dynamic", "aliases"):
+        node = arguments.get(field)
+        declaration[field] = _source(node, source) if node is not None else None
+    return declaration
+
+
+def parse_source(source, filename="<settings>"):
+    """
+    Return declarations and imports of a module, in source order.
+
+    Items are JSON-serializable dicts, either declarations (``kind`` is
+    ``config`` or ``secret``) or imports (``kind`` is ``import``).
+    """
+    tree = ast.parse(source, filename)
+    functions, modules = _configvars_bindings(tree)
+    nodes = sorted(
+        (
+            node
+            for node in ast.walk(tree)
+            if isinstance(node, (ast.Call, ast.Import, ast.ImportFrom))
+        ),
+        key=lambda node: (node.lineno, node.col_offset),
+    )
+
+    items = []
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                items.append({"kind": "import", "module": alias.name, "level": 0})
+        elif isinstance(node, ast.ImportFrom):
+            module = node.module or ""
+            items.append({"kind": "import", "module": module, "level": node.level})
+            for alias in node.names:
+                if alias.name != "*":
+                    name = f"{module}.{alias.name}" if module else alias.name
+                    items.append(
+                        {"kind": "import", "module": name, "level": node.level}
+                    )
+        else:
+            kind = _called_function(node, functions, modules)
+            if kind:
+                declaration = _declaration(kind, node, source)
+                if declaration:
+                    items.append(declaration)
+    return items
+
+
+def parse_file(path, cache_dir=None):
+    with open(path, "rb") as f:
+        content = f.read()
+    digest = hashlib.sha256(_PARSER_VERSION + content).hexdigest()
+    if digest in _cache:
+        return _cache[digest]
+
+    cache_path = os.path.join(cache_dir, f"{digest}.json") if cache_dir else None
+    items = None
+    if cache_path and os.path.exists(cache_path):
+        try:
+            with open(cache_path) as f:
+                items = json.load(f)
+        except (OSError, ValueError):
+            items = None
+    if items is None:
+        items = parse_source(content.decode(), path)
+        if cache_path:
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump(items, f)
+    _cache[digest] = items
+    return items
+
+
+def _project_root(path):
+    directory = os.path.dirname(os.path.abspath(path))
+    while os.path.isfile(os.path.join(directory, "__init__.py")):
+        directory = os.path.dirname(directory)
+    return directory
+
+
+def _module_file(item, path, root):
+    if item["level"]:
+        base = os.path.dirname(os.path.abspath(path))
+        for _ in range(item["level"] - 1):
+            base = os.path.dirname(base)
+    else:
+        base = root
+    parts = [part for part in item["module"].split(".") if part]
+    if not parts:
+        return None
+    candidate = os.path.join(base, *parts)
+    for filename in (f"{candidate}.py", os.path.join(candidate, "__init__.py")):
+        if os.path.isfile(filename):
+            return filename
+    return None
+
+
+def _config_variable(declaration):
+    default = _evaluate(declaration["default"])
+    secret = declaration["kind"] == "secret"
+    aliases = _evaluate(declaration.get("aliases"))
+    value = default
+    if secret and value not in (None, ""):
+        value = MASKED_SECRET_VALUE
+    return ConfigVariable(
+        name=declaration["name"],
+        value=value,
+        desc=_evaluate(declaration["desc"]),
+        default=default,
+        secret=secret,
+        file_var=declaration["file_var"],
+        interpolate=bool(_evaluate(declaration.get("interpolate"))),
+        dynamic=bool(_evaluate(declaration["dynamic"])),
+        source="default",
+        aliases=tuple(aliases) if isinstance(aliases, (list, tuple)) else (),
+    )
+
+
+def extract_config_variables(path, follow_imports=True, cache_dir=None):
+    """
+    Return declared variables in the shape of `get_config_variables()`.
+
+    Values are the declared defaults; nothing is resolved from the
+    environment or local settings. Imported project modules (found next to
+    `path` or below its project root) are followed when `follow_imports`
+    is set.
+    """
+    root = _project_root(path)
+    variables = {}
+    visited = set()
+
+    def visit(filename):
+        filename = os.path.abspath(filename)
+        if filename in visited:
+            return
+        visited.add(filename)
+        for item in parse_file(filename, cache_dir=cache_dir):
+            if item["kind"] == "import":
+                if follow_imports:
+                    module_file = _module_file(item, filename, root)
+                    if module_file:
+                        visit(module_file)
+            else:
+                variables[item["name"]] = _config_variable(item)
+
+    visit(path)
+    return list(variables.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m configvars.extract",
+        description="List config variables declared in a settings module",
+    )
+    parser.add_argument("path", help="Path to settings module")
+    parser.add_argument("--json", action="store_true", help="Output JSON")
+    parser.add_argument("--cache-dir", help="Directory for parse results cache")
+    parser.add_argument(
+        "--no-follow-imports",
+        action="store_false",
+        dest="follow_imports",
+        help="Do not parse imported project modules",
+    )
+    args = parser.parse_args(argv)
+
+    variables = extract_config_variables(
+        args.path, follow_imports=args.follow_imports, cache_dir=args.cache_dir
+    )
+    if args.json:
+        data = [
+            {
+                **{field: getattr(var, field) for field in ConfigVariable.__slots__},
+                "expression": isinstance(var.default, Expression),
+            }
+            for var in variables
+        ]
+        json.dump(data, sys.stdout, default=repr, indent=2)
+        print()
+        return
+    for var in variables:
+        comment = f"  # {var.desc}" if var.desc else ""
+        print(f"{var.name} = {repr(var.value)}{comment}")
+
+
+if __name__ == "__main__":
+    main()
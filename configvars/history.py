@@ -0,0 +1,193 @@
+"""
+Local SQLite history of resolved config variables.
+
+Each recording stores only the variables which changed (or disappeared)
+since the previous one. Secrets are stored only as HMAC digests keyed with a
+random salt of the history file.
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from . import _digest
+
+# commands which only read the history, and test runs, don't record
+SKIPPED_COMMANDS = ("configvars", "test")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    recorded_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS changes (
+    run_id INTEGER NOT NULL REFERENCES runs (id),
+    name TEXT NOT NULL,
+    source TEXT,
+    digest TEXT,
+    value TEXT,
+    secret INTEGER NOT NULL,
+    removed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS changes_name_run ON changes (name, run_id);
+"""
+
+LATEST_CHANGES = """
+SELECT name, source, digest, removed FROM changes
+WHERE rowid IN (SELECT MAX(rowid) FROM changes GROUP BY name)
+"""
+
+HistoryEntry = namedtuple(
+    "HistoryEntry", ["recorded_at", "source", "digest", "value", "secret", "removed"]
+)
+
+
+def _connect(path):
+    # created readable by the owner only, as it holds values and the salt
+    os.close(os.open(path, os.O_RDWR | os.O_CREAT, 0o600))
+    connection = sqlite3.connect(path, timeout=5, isolation_level=None)
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _connect_read_only(path):
+    uri = f"{Path(path).resolve().as_uri()}?mode=ro"
+    return sqlite3.connect(uri, timeout=5, uri=True)
+
+
+def _stored_value(var):
+    if var.secret:
+        return None
+    try:
+        return json.dumps(var.value)
+    except (TypeError, ValueError):
+        return repr(var.value)
+
+
+def _salt(connection):
+    connection.execute(
+        "INSERT OR IGNORE INTO meta (key, value) VALUES ('salt', ?)",
+        (os.urandom(32),),
+    )
+    return connection.execute("SELECT value FROM meta WHERE key = 'salt'").fetchone()[0]
+
+
+def _variable_digest(var, secret_digest, salt):
+    if var.secret and secret_digest is not None:
+        digest = secret_digest(var.name, salt)
+        if digest is not None:
+            return digest
+    return var.digest or _digest(var.value)
+
+
+def record(variables, path, recorded_at=None, secret_digest=None):
+    """
+    Store changes of `variables` since the previous recording in one
+    transaction. Return the number of stored changes.
+
+    `secret_digest(name, key)` (e.g. `Config.secret_digest`) returns digests
+    of secrets keyed with the salt of the history file.
+    """
+    connection = _connect(path)
+    try:
+        # serializes concurrent recorders, so each one diffs against the last
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            salt = _salt(connection)
+            current = {
+                var.name: (var.source, _variable_digest(var, secret_digest, salt), var)
+                for var in variables
+            }
+            previous = {
+                name: (source, digest)
+                for name, source, digest, removed in connection.execute(LATEST_CHANGES)
+                if not removed
+            }
+            changes = [
+                (name, source, digest, _stored_value(var), var.secret, False)
+                for name, (source, digest, var) in current.items()
+                if previous.get(name) != (source, digest)
+            ]
+            changes.extend(
+                (name, None, None, None, False, True)
+                for name in previous
+                if name not in current
+            )
+            if changes:
+                run_id = connection.execute(
+                    "INSERT INTO runs (recorded_at) VALUES (?)",
+                    (time.time() if recorded_at is None else recorded_at,),
+                ).lastrowid
+                connection.executemany(
+                    "INSERT INTO changes "
+                    "(run_id, name, source, digest, value, secret, removed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id,) + change for change in changes],
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+    finally:
+        connection.close()
+    return len(changes)
+
+
+def should_record(argv=None):
+    """Return whether this process should record, judging by its command."""
+    if "pytest" in sys.modules:
+        return False
+    argv = sys.argv if argv is None else argv
+    return not (len(argv) > 1 and argv[1] in SKIPPED_COMMANDS)
+
+
+def record_in_background(config, path):
+    """
+    Record the current registry of `config` in a daemon thread.
+
+    The registry is captured right away; digests and the write happen off
+    the calling thread. A write still running at exit is dropped.
+    """
+    variables = list(config.config_variables())
+
+    def run():
+        try:
+            record(variables, path, secret_digest=config.secret_digest)
+        except (OSError, sqlite3.Error):
+            from . import log
+
+            log.warning("Can't record config history in %s", path, exc_info=True)
+
+    thread = threading.Thread(target=run, name="configvars-history", daemon=True)
+    thread.start()
+    return thread
+
+
+def history(path, name):
+    """
+    Return recorded changes of variable `name`, oldest first. The file is
+    opened read-only; `sqlite3.OperationalError` is raised if it is missing.
+    """
+    connection = _connect_read_only(path)
+    try:
+        rows = connection.execute(
+            "SELECT runs.recorded_at, source, digest, value, secret, removed "
+            "FROM changes JOIN runs ON runs.id = changes.run_id "
+            "WHERE name = ? ORDER BY run_id",
+            (name,),
+        ).fetchall()
+    finally:
+        connection.close()
+    return [
+        HistoryEntry(recorded_at, source, digest, value, bool(secret), bool(removed))
+        for recorded_at, source, digest, value, secret, removed in rows
+    ]
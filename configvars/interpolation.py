@@ -0,0 +1,100 @@
+import re
+
+from django.core.exceptions import ImproperlyConfigured
+
+REFERENCE = re.compile(r"\$(?:\$|\{([A-Za-z_][A-Za-z0-9_]*)\})")
+
+
+def references(value):
+    if not isinstance(value, str):
+        return []
+    return [name for name in REFERENCE.findall(value) if name]
+
+
+def substitute(value, resolved):
+    if not isinstance(value, str):
+        return value
+
+    def replace(match):
+        name = match.group(1)
+        return "$" if name is None else str(resolved[name])
+
+    return REFERENCE.sub(replace, value)
+
+
+class Interpolator:
+    """
+    Resolves `${NAME}` references between config variables.
+
+    References form a dependency graph which is walked depth-first, so every
+    node is resolved after its dependencies (topological order). Only values
+    of variables for which `expands(name)` is true (declared with
+    `interpolate=True`) are expanded; other referenced values are inserted
+    verbatim. Cycles are reported with the full path. Resolved values and
+    the transitive dependencies of each node are memoized by name and raw
+    value. `$$` escapes a dollar sign.
+    """
+
+    def __init__(self, lookup, expands):
+        self._lookup = lookup
+        self._expands = expands
+        self._values = {}
+        self._dependencies = {}
+        self._verbatim = {}
+
+    def resolve(self, name, raw):
+        """Return the resolved value and names of its transitive dependencies."""
+        raws = {name: raw}
+        order = self._resolution_order(name, raws)
+        for node in order:
+            value = raws[node]
+            dependencies = set()
+            verbatim = set()
+            resolved = {}
+            for ref in references(value):
+                dependencies.add(ref)
+                key = (ref, raws[ref])
+                if ref in order or (self._expands(ref) and self._memoized(key, ())):
+                    resolved[ref] = self._values[key]
+                    dependencies.update(self._dependencies[key])
+                    verbatim.update(self._verbatim[key])
+                else:
+                    resolved[ref] = raws[ref]
+                    verbatim.add(ref)
+            self._values[(node, value)] = substitute(value, resolved)
+            self._dependencies[(node, value)] = frozenset(dependencies)
+            self._verbatim[(node, value)] = frozenset(verbatim)
+        return self._values[(name, raw)], self._dependencies[(name, raw)]
+
+    def _memoized(self, key, visiting):
+        # a memoized value is stale once a reference inserted verbatim
+        # is expanded, e.g. after its variable was declared interpolated
+        return key in self._values and not any(
+            ref in visiting or self._expands(ref) for ref in self._verbatim[key]
+        )
+
+    def _resolution_order(self, name, raws):
+        order = []
+        visiting = []
+
+        def visit(node):
+            visiting.append(node)
+            for ref in references(raws[node]):
+                if ref in visiting:
+                    cycle = " -> ".join(visiting[visiting.index(ref) :] + [ref])
+                    raise ImproperlyConfigured(
+                        f"Circular reference in config variables: {cycle}"
+                    )
+                if ref not in raws:
+                    raws[ref] = self._lookup(ref)
+                if (
+                    ref not in order
+                    and self._expands(ref)
+                    and not self._memoized((ref, raws[ref]), visiting)
+                ):
+                    visit(ref)
+            visiting.pop()
+            order.append(node)
+
+        visit(name)
+        return order
@@ -1,13 +1,22 @@
+import os
+
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
-from ... import get_config_variables
+from ... import default_config, get_config_variables
 
 
 class Command(BaseCommand):
     help = "Dump easysettings config"
 
     def add_arguments(self, parser):
+        parser.add_argument(
+            "subcommand",
+            nargs="?",
+            choices=["history"],
+            help="`history NAME` shows recorded changes of a variable",
+        )
+        parser.add_argument("name", nargs="?", help="Variable name for `history`")
         parser.add_argument(
             "--comments",
             action="store_true",
@@ -21,8 +30,33 @@ class Command(BaseCommand):
             action="store_true",
             help="Show default values instead of current",
         )
+        parser.add_argument(
+            "--sources",
+            action="store_true",
+            help="Show where each value comes from (env, local layer, default)",
+        )
+        parser.add_argument(
+            "--unknown",
+            action="store_true",
+            help="Show prefixed env variables not matching any config variable",
+        )
+        parser.add_argument(
+            "--usage",
+            action="store_true",
+            help="Show how many times each variable was read (least used first)",
+        )
 
     def handle(self, *args, **options):
+        if options.get("subcommand") == "history":
+            self.print_history(options.get("name"))
+            return
+        if options.get("unknown"):
+            self.print_unknown()
+            return
+        if options.get("usage"):
+            self.print_usage()
+            return
+
         info = options["comments"]
         for var in get_config_variables():
             if options["changed"] and var.default == var.value:
@@ -32,9 +66,58 @@ class Command(BaseCommand):
             else:
                 value = var.value
 
-            comment = ""
-            if info:
-                desc = var.desc
-                if desc:
-                    comment = f"  # {desc}"
+            comments = []
+            if info and var.desc:
+                comments.append(var.desc)
+            if options.get("sources"):
+                comments.append(f"from {var.source}")
+            comment = f"  # {'; '.join(comments)}" if comments else ""
             print(f"{var.name} = {repr(value)}{comment}")
+
+    def print_unknown(self):
+        for var in default_config.unknown_env_variables():
+            comment = ""
+            if var.suggestions:
+                comment = f"  # did you mean: {', '.join(var.suggestions)}?"
+            print(f"{var.name}{comment}")
+
+    def print_usage(self):
+        directory = getattr(settings, "CONFIGVARS_USAGE_DIR", None)
+        if directory:
+            from ...usage import read_usage
+
+            counts = read_usage(directory)
+            usage = {
+                var.name: counts.get(var.name, 0) for var in get_config_variables()
+            }
+        else:
+            usage = default_config.usage()
+        if usage is None:
+            raise CommandError(
+                "Usage tracking is not enabled. Set CONFIGVARS_USAGE_DIR."
+            )
+        for name, count in sorted(usage.items(), key=lambda item: item[1]):
+            print(f"{name} = {count}")
+
+    def print_history(self, name):
+        if not name:
+            raise CommandError("Provide a variable name: `configvars history NAME`.")
+        path = getattr(settings, "CONFIGVARS_HISTORY_FILE", None)
+        if not path:
+            raise CommandError("History is not enabled. Set CONFIGVARS_HISTORY_FILE.")
+        if not os.path.exists(path):
+            raise CommandError(f"History file {path} does not exist.")
+
+        from datetime import datetime
+
+        from ...history import history
+
+        for entry in history(path, name):
+            recorded_at = datetime.fromtimestamp(entry.recorded_at).isoformat(" ")
+            if entry.removed:
+                change = "removed"
+            elif entry.secret:
+                change = f"= <hmac {entry.digest[:12]}>  # from {entry.source}"
+            else:
+                change = f"= {entry.value}  # from {entry.source}"
+            print(f"{recorded_at}  {name} {change}")
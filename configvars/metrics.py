@@ -0,0 +1,129 @@
+"""
+Configuration health metrics in the Prometheus text exposition format.
+
+Add the view to your URLconf::
+
+    path("", include("configvars.urls"))
+"""
+
+import threading
+from collections import Counter
+
+from . import apps, default_config
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _metric(lines, name, kind, description, samples):
+    lines.append(f"# HELP {name} {description}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        label_text = ",".join(f'{key}="{_escape(val)}"' for key, val in labels)
+        lines.append(f"{name}{{{label_text}}} {value}" if labels else f"{name} {value}")
+
+
+class Metrics:
+    """
+    Cached metrics response of a config.
+
+    The response is rendered once and reused until the config changes
+    (initialization, registration or restore), so scraping only returns
+    precomputed bytes.
+    """
+
+    def __init__(self, config, checks=()):
+        self._config = config
+        self._checks = checks
+        self._generation = None
+        self._content = b""
+        self._lock = threading.Lock()
+
+    def render(self):
+        generation = self._config._generation
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    self._content = self._render().encode()
+                    self._generation = generation
+        return self._content
+
+    def _render(self):
+        config = self._config
+        variables = list(config.config_variables())
+        reads = config.secret_file_reads()
+        lines = []
+
+        _metric(
+            lines,
+            "configvars_registered_variables",
+            "gauge",
+            "Number of registered config variables.",
+            [((), len(variables))],
+        )
+        sources = Counter(var.source for var in variables)
+        _metric(
+            lines,
+            "configvars_variables_by_source",
+            "gauge",
+            "Number of registered config variables by resolved source.",
+            [
+                ((("source", source),), count)
+                for source, count in sorted(sources.items())
+            ],
+        )
+        _metric(
+            lines,
+            "configvars_secret_file_read_seconds",
+            "gauge",
+            "Time spent reading secret files.",
+            [
+                ((("name", name),), seconds)
+                for name, (seconds, _) in sorted(reads.items())
+            ],
+        )
+        _metric(
+            lines,
+            "configvars_failed_checks",
+            "gauge",
+            "Number of messages reported by configvars system checks.",
+            [
+                ((("check", check.__name__),), len(check(None)))
+                for check in self._checks
+            ],
+        )
+        if reads:
+            _metric(
+                lines,
+                "configvars_secret_last_rotation_timestamp_seconds",
+                "gauge",
+                "Latest modification time of read secret files.",
+                [((), max(mtime for _, mtime in reads.values()))],
+            )
+        _metric(
+            lines,
+            "configvars_info",
+            "gauge",
+            "Fingerprint of resolved names, sources and values.",
+            [((("fingerprint", config.fingerprint()),), 1)],
+        )
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics(
+    default_config,
+    checks=(
+        apps.check_local_settings,
+        apps.check_unknown_env_variables,
+        apps.check_deprecated_names,
+    ),
+)
+
+
+def metrics_view(request):
+    from django.http import HttpResponse
+
+    return HttpResponse(metrics.render(), content_type=CONTENT_TYPE)
@@ -0,0 +1,11 @@
+import pytest
+
+from . import default_config
+
+
+@pytest.fixture
+def configvars_state():
+    """Yield `default_config` and restore its state after the test."""
+    token = default_config.snapshot()
+    yield default_config
+    default_config.restore(token)
@@ -0,0 +1,175 @@
+import base64
+import http.client
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from urllib.parse import urlencode, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+log = logging.getLogger("configvars")
+
+
+class ConnectionPool:
+    """Keep-alive HTTP connections reused across fetches, per host."""
+
+    def __init__(self):
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, scheme, netloc, timeout):
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        if scheme == "https":
+            return http.client.HTTPSConnection(netloc, timeout=timeout)
+        return http.client.HTTPConnection(netloc, timeout=timeout)
+
+    def release(self, scheme, netloc, connection):
+        with self._lock:
+            self._idle.setdefault((scheme, netloc), []).append(connection)
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for connection in connections:
+                connection.close()
+
+
+pool = ConnectionPool()
+
+
+class HTTPKeyValueProvider:
+    """
+    Consul-style key-value provider for `Config.initialize(providers=...)`.
+
+    All keys below `prefix` are fetched with a single recursive request.
+    Results are kept in memory for `ttl` seconds and, when `cache_file` is
+    set, persisted as the last known good values. Once the cache file exists,
+    `fetch()` returns its content immediately and refreshes it in a
+    background thread.
+    """
+
+    def __init__(
+        self, url, prefix="", ttl=60, cache_file=None, timeout=5, headers=None
+    ):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "http"
+        self.netloc = parts.netloc
+        self.path = parts.path.rstrip("/") + "/"
+        self.prefix = prefix
+        self.ttl = ttl
+        self.cache_file = cache_file
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        self._values = None
+        self._fetched_at = None
+        self._lock = threading.Lock()
+        self._refresh_thread = None
+
+    def fetch(self):
+        with self._lock:
+            if self._is_fresh():
+                return self._values
+            if self._values is None and self.cache_file:
+                cached = self._read_cache_file()
+                if cached is not None:
+                    self._values = cached
+                    self._start_refresh()
+                    return cached
+        return self.refresh()
+
+    def refresh(self):
+        try:
+            values = self.parse_response(self._request())
+        except (
+            OSError,
+            http.client.HTTPException,
+            ValueError,
+            KeyError,
+            TypeError,
+            AttributeError,
+        ) as exc:
+            if self._values is not None:
+                log.warning("Can't refresh config from %s: %s", self.netloc, exc)
+                return self._values
+            raise ImproperlyConfigured(
+                f"Can't fetch config from {self.scheme}://{self.netloc}: {exc}"
+            ) from exc
+
+        with self._lock:
+            self._values = values
+            self._fetched_at = time.monotonic()
+        if self.cache_file:
+            self._write_cache_file(values)
+        return values
+
+    def parse_response(self, body):
+        values = {}
+        for item in json.loads(body.decode()) or ():
+            key = item["Key"][len(self.prefix) :]
+            if not key or key.endswith("/"):
+                continue
+            value = item.get("Value")
+            if value is not None:
+                value = base64.b64decode(value).decode()
+            values[key] = value
+        return values
+
+    def _request(self):
+        url = f"{self.path}{self.prefix}?{urlencode({'recurse': 'true'})}"
+        for attempt in (1, 2):
+            connection = pool.acquire(self.scheme, self.netloc, self.timeout)
+            try:
+                connection.request("GET", url, headers=self.headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException):
+                connection.close()
+                # a pooled connection may have been closed by the server
+                if attempt == 2:
+                    raise
+                continue
+            pool.release(self.scheme, self.netloc, connection)
+            if response.status == 404:
+                return b"[]"
+            if response.status != 200:
+                raise http.client.HTTPException(f"HTTP {response.status}")
+            return body
+
+    def _is_fresh(self):
+        return (
+            self._fetched_at is not None
+            and time.monotonic() - self._fetched_at < self.ttl
+        )
+
+    def _start_refresh(self):
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._refresh_thread = threading.Thread(target=self.refresh, daemon=True)
+        self._refresh_thread.start()
+
+    def _read_cache_file(self):
+        try:
+            with open(self.cache_file) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_cache_file(self, values):
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        path = None
+        try:
+            fd, path = tempfile.mkstemp(dir=directory, prefix=".configvars-")
+            with os.fdopen(fd, "w") as f:
+                json.dump(values, f)
+            os.replace(path, self.cache_file)
+        except OSError as exc:
+            log.warning("Can't write config cache %s: %s", self.cache_file, exc)
+            if path and os.path.exists(path):
+                os.unlink(path)
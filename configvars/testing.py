@@ -0,0 +1,15 @@
+from . import default_config
+
+
+class ConfigVarsStateMixin:
+    """
+    Test case mixin restoring the state of `configvars_config` after each
+    test (`default_config` unless overridden).
+    """
+
+    configvars_config = default_config
+
+    def setUp(self):
+        super().setUp()
+        token = self.configvars_config.snapshot()
+        self.addCleanup(self.configvars_config.restore, token)
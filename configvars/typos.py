@@ -0,0 +1,125 @@
+import collections
+import os
+
+UnknownEnvVariable = collections.namedtuple("UnknownEnvVariable", "name suggestions")
+
+NGRAM_SIZE = 3
+
+
+def _ngrams(name):
+    padded = f"^{name}$"
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def _max_distance(name):
+    return max(1, min(3, len(name) // 4))
+
+
+def _edit_distance(a, b, limit):
+    """Optimal string alignment distance, short-circuited above `limit`."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit and min(previous) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+class NameIndex:
+    """
+    N-gram index of registered names.
+
+    Only names sharing enough n-grams with the looked up name (q-gram lemma)
+    are compared with edit distance, so lookups do not scale with the
+    number of registered names. Short names may share no n-gram with a
+    close match, so they are compared with all names of similar length.
+    """
+
+    def __init__(self, names):
+        self._names = []
+        self._postings = collections.defaultdict(list)
+        self._lengths = collections.defaultdict(list)
+        for name in sorted(set(names)):
+            position = len(self._names)
+            self._names.append(name)
+            self._lengths[len(name)].append(position)
+            for gram in _ngrams(name):
+                self._postings[gram].append(position)
+
+    def suggest(self, name, limit=3):
+        grams = _ngrams(name)
+        shared = collections.Counter()
+        for gram in grams:
+            shared.update(self._postings.get(gram, ()))
+
+        max_distance = _max_distance(name)
+        candidates = set()
+        for position, count in shared.items():
+            candidate = self._names[position]
+            required = max(len(name), len(candidate)) - (NGRAM_SIZE + 1) * max_distance
+            if count >= required:
+                candidates.add(candidate)
+        if len(name) < 2 * NGRAM_SIZE:
+            for length in range(len(name) - max_distance, len(name) + max_distance + 1):
+                candidates.update(
+                    self._names[position] for position in self._lengths.get(length, ())
+                )
+
+        matches = []
+        for candidate in candidates:
+            distance = _edit_distance(name, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, candidate))
+        return [candidate for _, candidate in sorted(matches)[:limit]]
+
+
+def registered_names(config):
+    names = set()
+    for var in config.config_variables():
+        names.add(var.name)
+        names.update(var.aliases)
+        if var.file_var:
+            names.add(var.file_var)
+    return names
+
+
+def find_unknown_env_variables(config, environ=None, max_suggestions=3):
+    prefix = config.ENV_PREFIX
+    if not prefix:
+        return []
+    if environ is None:
+        environ = os.environ
+
+    known = registered_names(config)
+    unknown = sorted(
+        key
+        for key in environ
+        if key.startswith(prefix) and key[len(prefix) :] not in known
+    )
+    if not unknown:
+        return []
+
+    index = NameIndex(known)
+    return [
+        UnknownEnvVariable(
+            name=key,
+            suggestions=[
+                f"{prefix}{name}"
+                for name in index.suggest(key[len(prefix) :], limit=max_suggestions)
+            ],
+        )
+        for key in unknown
+    ]
@@ -0,0 +1,7 @@
+from django.urls import path
+
+from .metrics import metrics_view
+
+urlpatterns = [
+    path("metrics", metrics_view, name="configvars-metrics"),
+]
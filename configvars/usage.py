@@ -0,0 +1,243 @@
+import atexit
+import json
+import os
+import threading
+import time
+
+from . import default_config
+
+DEFAULT_WRITE_INTERVAL = 60
+COMPACTED_USAGE_FILE = "compacted.json"
+
+
+def _add_counts(total, counts):
+    for name, count in counts.items():
+        total[name] = total.get(name, 0) + count
+
+
+class UsageCounter:
+    """
+    Per-variable access counters.
+
+    Every thread increments its own bucket without locking; buckets are
+    merged only when `counts()` is called. Buckets of finished threads are
+    folded into base counts, so thread pools which replace their threads
+    don't grow the list of buckets.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._base = {}
+        self._buckets = []
+        self._lock = threading.Lock()
+
+    def _bucket(self):
+        try:
+            return self._local.bucket
+        except AttributeError:
+            bucket = self._local.bucket = {}
+            with self._lock:
+                self._merge_finished()
+                self._buckets.append((threading.current_thread(), bucket))
+            return bucket
+
+    def _merge_finished(self):
+        # a finished thread no longer writes to its bucket
+        buckets = []
+        for thread, bucket in self._buckets:
+            if thread.is_alive():
+                buckets.append((thread, bucket))
+            else:
+                _add_counts(self._base, bucket)
+        self._buckets = buckets
+
+    def reset(self):
+        with self._lock:
+            self._local = threading.local()
+            self._base = {}
+            self._buckets = []
+
+    def record(self, name):
+        bucket = self._bucket()
+        bucket[name] = bucket.get(name, 0) + 1
+
+    def counts(self):
+        with self._lock:
+            self._merge_finished()
+            total = dict(self._base)
+            buckets = [bucket for _, bucket in self._buckets]
+        for bucket in buckets:
+            _add_counts(total, dict(bucket))
+        return total
+
+
+class UsageWriter:
+    """
+    Writes merged counts of a `UsageCounter` to a JSON file in `directory`.
+
+    Each process writes its own file every `interval` seconds from a daemon
+    thread and once more at exit. Forked children start from zero and write
+    to their own file. Files not updated for `compact_after` seconds (ten
+    intervals by default) belong to exited processes and are merged into
+    `COMPACTED_USAGE_FILE` by `compact()`.
+    """
+
+    def __init__(
+        self, counter, directory, interval=DEFAULT_WRITE_INTERVAL, compact_after=None
+    ):
+        self._counter = counter
+        self.directory = directory
+        self.interval = interval
+        self.compact_after = compact_after or 10 * interval
+        self._stopped = threading.Event()
+        self._path = None
+
+    def start(self):
+        atexit.register(self._write_at_exit)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._restart_in_child)
+        self._start_thread()
+
+    def stop(self):
+        self._stopped.set()
+
+    def write(self):
+        counts = self._counter.counts()
+        if not counts:
+            return
+        temp_path = f"{self._path}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temp_path, "w") as f:
+                json.dump(counts, f)
+            os.replace(temp_path, self._path)
+        except OSError:
+            from . import log
+
+            log.warning("Can't write config usage to %s", self._path, exc_info=True)
+
+    def compact(self):
+        """
+        Merge usage files of exited processes into `COMPACTED_USAGE_FILE`.
+
+        Writers sharing the directory compact under an exclusive lock; where
+        `fcntl` is not available files are left as they are.
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return
+        try:
+            with open(os.path.join(self.directory, ".lock"), "a") as lock:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    # another process is compacting
+                    return
+                self._compact()
+        except OSError:
+            from . import log
+
+            log.warning(
+                "Can't compact config usage in %s", self.directory, exc_info=True
+            )
+
+    def _compact(self):
+        compacted_path = os.path.join(self.directory, COMPACTED_USAGE_FILE)
+        stale_before = time.time() - self.compact_after
+        stale = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if (
+                    entry.name.endswith((".json", ".tmp"))
+                    and entry.name != COMPACTED_USAGE_FILE
+                    and entry.path != self._path
+                    and _modified_before(entry, stale_before)
+                ):
+                    stale.append(entry.path)
+        if not stale:
+            return
+
+        total = _read_counts(compacted_path) or {}
+        for path in stale:
+            if path.endswith(".json"):
+                _add_counts(total, _read_counts(path) or {})
+        temp_path = f"{compacted_path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(total, f)
+        os.replace(temp_path, compacted_path)
+        for path in stale:
+            os.unlink(path)
+
+    def _start_thread(self):
+        name = f"{os.getpid()}-{int(time.time() * 1000)}.json"
+        self._path = os.path.join(self.directory, name)
+        thread = threading.Thread(target=self._run, name="configvars-usage")
+        thread.daemon = True
+        thread.start()
+
+    def _restart_in_child(self):
+        if not self._stopped.is_set():
+            self._counter.reset()
+            self._start_thread()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.write()
+            self.compact()
+
+    def _write_at_exit(self):
+        if not self._stopped.is_set():
+            self._stopped.set()
+            self.write()
+
+
+def _modified_before(entry, timestamp):
+    try:
+        return entry.stat().st_mtime < timestamp
+    except FileNotFoundError:
+        # e.g. a temporary file which was just renamed
+        return False
+
+
+def _read_counts(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def read_usage(directory):
+    """Return counts summed over all usage files in `directory`."""
+    total = {}
+    try:
+        filenames = sorted(os.listdir(directory))
+    except OSError:
+        return total
+    for filename in filenames:
+        if filename.endswith(".json"):
+            _add_counts(total, _read_counts(os.path.join(directory, filename)) or {})
+    return total
+
+
+class TrackedSettings:
+    """
+    Read-only proxy to Django settings which counts reads of registered
+    config variables when usage tracking is enabled.
+    """
+
+    def __init__(self, config, settings=None):
+        self._config = config
+        self._settings = settings
+
+    def __getattr__(self, name):
+        settings = self._settings
+        if settings is None:
+            from django.conf import settings
+        value = getattr(settings, name)
+        self._config.record_access(name)
+        return value
+
+
+settings = TrackedSettings(default_config)
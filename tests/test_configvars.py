@@ -1,16 +1,39 @@
 import argparse
+import asyncio
 import io
+import json
 import os
+import shutil
+import subprocess
 import sys
 import tempfile
+import threading
+import time
 import types
 import unittest
 from contextlib import contextmanager, redirect_stdout
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
+
+import django
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
 
 import configvars
-from configvars import as_bool, as_list
+from configvars import as_bool, as_json, as_list, as_tuple, freeze, usage
 from configvars.management.commands import configvars as configvars_command
+from configvars.testing import ConfigVarsStateMixin
+from configvars.typos import NameIndex
+from configvars.usage import TrackedSettings, UsageWriter, read_usage
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=["configvars", "configvars.dynamic"],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+    )
+    django.setup()
 
 
 @contextmanager
@@ -92,6 +115,42 @@ def secret_result():
             os.unlink(temp.name)
 
 
+@contextmanager
+def binary_secret(content, **kwargs):
+    with temporary_module("binsecret.local"):
+        cfg = configvars.default_config
+        temp = tempfile.NamedTemporaryFile("wb+", delete=False)
+        try:
+            temp.write(content)
+            temp.flush()
+            with patch.dict(os.environ, {"SECRET_FILE": temp.name}, clear=True):
+                cfg.initialize(local_settings_module="binsecret.local")
+                yield cfg.secret(
+                    "SECRET", file_var="SECRET_FILE", binary=True, **kwargs
+                )
+        finally:
+            temp.close()
+            os.unlink(temp.name)
+
+
+@contextmanager
+def secret_file(content):
+    temp = tempfile.NamedTemporaryFile("w+", delete=False)
+    try:
+        temp.write(content)
+        temp.flush()
+        yield temp.name
+    finally:
+        temp.close()
+        os.unlink(temp.name)
+
+
+async def gather_secrets(cfg, count):
+    return await asyncio.gather(
+        *[cfg.asecret("SECRET", file_var="SECRET_FILE") for _ in range(count)]
+    )
+
+
 @contextmanager
 def wrapper_vars():
     cfg = configvars.default_config
@@ -116,6 +175,149 @@ def local_settings_warnings():
         yield check_local_settings(None)
 
 
+@contextmanager
+def unknown_env_result(env):
+    with temporary_module("typoproj.local"):
+        cfg = configvars.default_config
+        with patch.dict(os.environ, env, clear=True):
+            cfg.initialize(local_settings_module="typoproj.local", env_prefix="APP_")
+            cfg.config("DB_HOST", "localhost")
+            cfg.secret("DB_PASSWORD", file_var="DB_PASSWORD_FILE")
+            yield cfg.unknown_env_variables()
+
+
+IMPORT_TIME_BUDGET_US = 25000
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_configvars_in_subprocess():
+    code = (
+        "import sys; import configvars; "
+        "print(','.join(name for name in ('django', 'dataclasses', 'typing') "
+        "if name in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT)
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+
+
+def cumulative_import_time(stderr, module_name):
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module_name:
+            return int(parts[1])
+    return None
+
+
+@contextmanager
+def tracked_settings():
+    with temporary_module("usageproj.local"):
+        cfg = configvars.default_config
+        with patch.dict(os.environ, {}, clear=True):
+            cfg.initialize(local_settings_module="usageproj.local")
+            cfg.config("HOT", 1)
+            cfg.config("DEAD", 2)
+            cfg.enable_usage_tracking()
+            yield TrackedSettings(cfg, types.SimpleNamespace(HOT=1, DEAD=2, OTHER=3))
+
+
+@contextmanager
+def usage_dir():
+    directory = tempfile.mkdtemp()
+    try:
+        yield directory
+    finally:
+        shutil.rmtree(directory)
+
+
+def write_usage_file(directory, filename, counts, age=0):
+    path = os.path.join(directory, filename)
+    with open(path, "w") as f:
+        json.dump(counts, f)
+    modified = time.time() - age
+    os.utime(path, (modified, modified))
+
+
+def record_in_thread(counter, name, count):
+    thread = threading.Thread(
+        target=lambda: [counter.record(name) for _ in range(count)]
+    )
+    thread.start()
+    thread.join()
+
+
+def read_setting(settings, name, count):
+    for _ in range(count):
+        getattr(settings, name)
+
+
+@contextmanager
+def interpolation_config(env=None, **local_attrs):
+    with temporary_module("interpproj.local", **local_attrs):
+        cfg = configvars.default_config
+        with patch.dict(os.environ, env or {}, clear=True):
+            cfg.initialize(local_settings_module="interpproj.local")
+            yield cfg
+
+
+@contextmanager
+def snapshot_config():
+    with temporary_module("snapproj.local", FOO="local"):
+        cfg = configvars.default_config
+        with patch.dict(os.environ, {}, clear=True):
+            cfg.initialize(local_settings_module="snapproj.local", env_prefix="APP_")
+            cfg.config("FOO", "default")
+            yield cfg, cfg.snapshot()
+
+
+def registry_names(cfg):
+    return [var.name for var in cfg.config_variables()]
+
+
+def run_in_threads(target, count=8):
+    barrier = threading.Barrier(count)
+
+    def run(index):
+        barrier.wait()
+        target(index)
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@contextmanager
+def layered_config(env=None, **kwargs):
+    with temporary_module("layproj.local", FOO="base", BAR="base"):
+        with temporary_module("layproj.local_prod", FOO="prod"):
+            cfg = configvars.default_config
+            with patch.dict(os.environ, env or {}, clear=True):
+                cfg.initialize(**kwargs)
+                yield cfg
+
+
+@contextmanager
+def aliased_config(env=None, **local_attrs):
+    with temporary_module("aliasproj.local", **local_attrs):
+        cfg = configvars.default_config
+        with patch.dict(os.environ, env or {}, clear=True):
+            cfg.initialize(
+                local_settings_module="aliasproj.local",
+                env_prefix="APP_",
+                fallback_prefixes=["LEGACY_", "OLD_"],
+            )
+            yield cfg
+
+
 def run_command(**options):
     command = configvars_command.Command()
     output = io.StringIO()
@@ -491,6 +693,34 @@ class ConfigVarsTests(unittest.TestCase):
     def test_as_list_none_returns_empty(self):
         self.assertEqual(as_list(None), [])
 
+    def test_as_tuple_splits_string(self):
+        self.assertEqual(as_tuple("a,b"), ("a", "b"))
+
+    def test_as_tuple_shares_result_for_same_input(self):
+        self.assertIs(as_tuple("x.example,y.example"), as_tuple("x.example,y.example"))
+
+    def test_as_tuple_freezes_list(self):
+        self.assertEqual(as_tuple(["a", "b"]), ("a", "b"))
+
+    def test_as_tuple_none_returns_empty(self):
+        self.assertEqual(as_tuple(None), ())
+
+    def test_as_json_returns_read_only_mapping(self):
+        with self.assertRaises(TypeError):
+            as_json('{"default": {"HOST": "db"}}')["other"] = {}
+
+    def test_as_json_freezes_nested_values(self):
+        self.assertEqual(as_json('{"hosts": ["a", "b"]}')["hosts"], ("a", "b"))
+
+    def test_as_json_shares_result_for_same_input(self):
+        self.assertIs(as_json('["a", {"b": 1}]'), as_json('["a", {"b": 1}]'))
+
+    def test_as_json_freezes_non_string_value(self):
+        self.assertEqual(as_json(["a", ["b"]]), ("a", ("b",)))
+
+    def test_freeze_converts_set(self):
+        self.assertEqual(freeze({"a"}), frozenset({"a"}))
+
     def test_as_bool_true_for_one(self):
         self.assertTrue(as_bool("1"))
 
@@ -542,3 +772,723 @@ class ConfigVarsTests(unittest.TestCase):
         with patch.object(config_apps, "register") as register_mock:
             config_apps.ConfigVarsAppConfig("configvars", config_apps).ready()
             self.assertTrue(register_mock.called)
+
+    def test_unknown_env_variables_reports_typo(self):
+        with unknown_env_result({"APP_DB_PASWORD": "x"}) as unknown:
+            self.assertEqual([var.name for var in unknown], ["APP_DB_PASWORD"])
+
+    def test_unknown_env_variables_suggests_closest_name(self):
+        with unknown_env_result({"APP_DB_PASWORD": "x"}) as unknown:
+            self.assertEqual(unknown[0].suggestions, ["APP_DB_PASSWORD"])
+
+    def test_unknown_env_variables_accepts_file_var(self):
+        with unknown_env_result({"APP_DB_PASSWORD_FILE": ""}) as unknown:
+            self.assertEqual(unknown, [])
+
+    def test_unknown_env_variables_ignores_unprefixed(self):
+        with unknown_env_result({"DB_PASWORD": "x"}) as unknown:
+            self.assertEqual(unknown, [])
+
+    def test_unknown_env_variables_without_suggestion(self):
+        with unknown_env_result({"APP_COMPLETELY_OTHER": "x"}) as unknown:
+            self.assertEqual(unknown[0].suggestions, [])
+
+    def test_unknown_env_variables_empty_without_prefix(self):
+        with temporary_module("typoproj.local"):
+            with patch.dict(os.environ, {"DB_PASWORD": "x"}, clear=True):
+                self.cfg.initialize(local_settings_module="typoproj.local")
+                self.cfg.config("DB_PASSWORD")
+                self.assertEqual(self.cfg.unknown_env_variables(), [])
+
+    def test_name_index_suggests_among_many_names(self):
+        index = NameIndex([f"SERVICE_{i}_URL" for i in range(5000)] + ["DB_HOST"])
+        self.assertEqual(index.suggest("DB_HSOT"), ["DB_HOST"])
+
+    def test_name_index_suggests_short_names(self):
+        self.assertEqual(NameIndex(["DB", "DEBUG"]).suggest("DC"), ["DB"])
+
+    def test_check_unknown_env_variables_warning_hint(self):
+        from configvars.apps import check_unknown_env_variables
+
+        with unknown_env_result({"APP_DB_PASWORD": "x"}):
+            warnings = check_unknown_env_variables(None)
+            self.assertEqual(warnings[0].hint, "Did you mean APP_DB_PASSWORD?")
+
+    def test_command_unknown_prints_suggestion(self):
+        with unknown_env_result({"APP_DB_PASWORD": "x"}):
+            output = run_command(unknown=True)
+            self.assertEqual(
+                output.strip(), "APP_DB_PASWORD  # did you mean: APP_DB_PASSWORD?"
+            )
+
+    def test_secret_binary_returns_memoryview(self):
+        with binary_secret(b"\x00\xff") as value:
+            self.assertIsInstance(value, memoryview)
+            self.assertEqual(value, b"\x00\xff")
+
+    def test_secret_binary_small_file_is_read_only(self):
+        with binary_secret(b"\x00\xff") as value:
+            self.assertTrue(value.readonly)
+
+    def test_secret_binary_large_file_returns_memoryview(self):
+        content = b"x" * configvars.MMAP_SECRET_FILE_THRESHOLD
+        with binary_secret(content, max_size=len(content)) as value:
+            self.assertIsInstance(value, memoryview)
+
+    def test_secret_binary_large_file_content(self):
+        content = b"x" * configvars.MMAP_SECRET_FILE_THRESHOLD
+        with binary_secret(content, max_size=len(content)) as value:
+            self.assertEqual(value.tobytes(), content)
+
+    def test_secret_binary_large_file_is_read_only(self):
+        content = b"x" * configvars.MMAP_SECRET_FILE_THRESHOLD
+        with binary_secret(content, max_size=len(content)) as value:
+            self.assertTrue(value.readonly)
+
+    def test_secret_binary_allows_multiline_by_default(self):
+        with binary_secret(b"\x30\x0a\x02\x01") as value:
+            self.assertEqual(value, b"\x30\x0a\x02\x01")
+
+    def test_secret_binary_rejects_multiline_when_disabled(self):
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            with binary_secret(b"line1\nline2", allow_multiline=False):
+                pass
+
+    def test_secret_max_size_overrides_default_limit(self):
+        content = b"x" * (configvars.MAX_SECRET_FILE_SIZE + 1)
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            with binary_secret(content, max_size=configvars.MAX_SECRET_FILE_SIZE):
+                pass
+
+    def test_secret_max_size_allows_larger_file(self):
+        content = b"x" * (configvars.MAX_SECRET_FILE_SIZE + 1)
+        with binary_secret(content, max_size=len(content)) as value:
+            self.assertEqual(len(value), len(content))
+
+    def test_secret_binary_value_is_hidden(self):
+        with binary_secret(b"\x00\xff"):
+            var = list(self.cfg.config_variables())[0]
+            self.assertEqual(var.value, "*****")
+
+    def test_secret_binary_encodes_literal_value(self):
+        with temporary_module("binsecret.local"):
+            with patch.dict(os.environ, {"SECRET": "plain"}, clear=True):
+                self.cfg.initialize(local_settings_module="binsecret.local")
+                value = self.cfg.secret("SECRET", binary=True)
+                self.assertIsInstance(value, memoryview)
+                self.assertEqual(value, b"plain")
+
+    def test_aconfig_resolves_value(self):
+        with config_value("asyncproj.local", {"FOO": "env"}, "FOO"):
+            self.assertEqual(asyncio.run(self.cfg.aconfig("FOO", "default")), "env")
+
+    def test_aconfig_wrapper_uses_default_config(self):
+        with config_value("asyncproj.local", {}, "FOO", FOO="local"):
+            self.assertEqual(asyncio.run(configvars.aconfig("FOO")), "local")
+
+    def test_asecret_reads_file_content(self):
+        with temporary_module("asyncproj.local"), secret_file("topsecret") as path:
+            with patch.dict(os.environ, {"SECRET_FILE": path}, clear=True):
+                self.cfg.initialize(local_settings_module="asyncproj.local")
+                value = asyncio.run(
+                    configvars.asecret("SECRET", file_var="SECRET_FILE")
+                )
+                self.assertEqual(value, "topsecret")
+
+    def test_asecret_collapses_concurrent_reads(self):
+        with temporary_module("asyncproj.local"), secret_file("topsecret") as path:
+            with patch.dict(os.environ, {"SECRET_FILE": path}, clear=True):
+                self.cfg.initialize(local_settings_module="asyncproj.local")
+                with patch.object(
+                    self.cfg, "_read_secret_file", wraps=self.cfg._read_secret_file
+                ) as read_mock:
+                    asyncio.run(gather_secrets(self.cfg, 5))
+                    self.assertEqual(read_mock.call_count, 1)
+
+    def test_asecret_shares_result_between_concurrent_calls(self):
+        with temporary_module("asyncproj.local"), secret_file("topsecret") as path:
+            with patch.dict(os.environ, {"SECRET_FILE": path}, clear=True):
+                self.cfg.initialize(local_settings_module="asyncproj.local")
+                values = asyncio.run(gather_secrets(self.cfg, 3))
+                self.assertEqual(values, ["topsecret"] * 3)
+
+    def test_asecret_clears_inflight_requests(self):
+        with temporary_module("asyncproj.local"), secret_file("topsecret") as path:
+            with patch.dict(os.environ, {"SECRET_FILE": path}, clear=True):
+                self.cfg.initialize(local_settings_module="asyncproj.local")
+                asyncio.run(gather_secrets(self.cfg, 3))
+                self.assertEqual(self.cfg._inflight, {})
+
+    def test_asecret_raises_like_secret(self):
+        with temporary_module("asyncproj.local"):
+            with patch.dict(
+                os.environ, {"SECRET": "plain", "SECRET_FILE": "path"}, clear=True
+            ):
+                self.cfg.initialize(local_settings_module="asyncproj.local")
+                with self.assertRaises(configvars.ImproperlyConfigured):
+                    asyncio.run(self.cfg.asecret("SECRET", file_var="SECRET_FILE"))
+
+    def test_aconfig_keeps_defaults_of_equal_value(self):
+        async def gather_defaults():
+            return await asyncio.gather(
+                self.cfg.aconfig("FOO", 1),
+                self.cfg.aconfig("FOO", True),
+                self.cfg.aconfig("FOO", 1.0),
+            )
+
+        with config_value("asyncproj.local", {}, "FOO"):
+            values = asyncio.run(gather_defaults())
+            self.assertEqual([type(value) for value in values], [int, bool, float])
+
+    def test_aconfig_supports_unhashable_default(self):
+        with config_value("asyncproj.local", {}, "FOO"):
+            self.assertEqual(asyncio.run(self.cfg.aconfig("FOO", ["a"])), ["a"])
+
+    def test_usage_counts_reads(self):
+        with tracked_settings() as settings:
+            read_setting(settings, "HOT", 3)
+            self.assertEqual(self.cfg.usage()["HOT"], 3)
+
+    def test_usage_reports_unread_variable(self):
+        with tracked_settings():
+            self.assertEqual(self.cfg.usage()["DEAD"], 0)
+
+    def test_usage_ignores_unregistered_settings(self):
+        with tracked_settings() as settings:
+            settings.OTHER
+            self.assertNotIn("OTHER", self.cfg.usage())
+
+    def test_usage_merges_thread_buckets(self):
+        with tracked_settings() as settings:
+            threads = [
+                threading.Thread(target=read_setting, args=(settings, "HOT", 100))
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(self.cfg.usage()["HOT"], 400)
+
+    def test_usage_counter_merges_finished_threads(self):
+        counter = usage.UsageCounter()
+        for _ in range(3):
+            record_in_thread(counter, "HOT", 2)
+        counter.counts()
+        self.assertEqual(counter._buckets, [])
+
+    def test_usage_counter_keeps_counts_of_finished_threads(self):
+        counter = usage.UsageCounter()
+        for _ in range(3):
+            record_in_thread(counter, "HOT", 2)
+        counter.record("HOT")
+        self.assertEqual(counter.counts(), {"HOT": 7})
+
+    def test_usage_is_none_when_tracking_disabled(self):
+        with wrapper_vars():
+            self.assertIsNone(self.cfg.usage())
+
+    def test_tracked_settings_returns_setting_value(self):
+        with tracked_settings() as settings:
+            self.assertEqual(settings.HOT, 1)
+
+    def test_command_usage_prints_least_used_first(self):
+        with tracked_settings() as settings:
+            read_setting(settings, "HOT", 2)
+            output = run_command(usage=True)
+            self.assertEqual(output.splitlines(), ["DEAD = 0", "HOT = 2"])
+
+    def test_usage_writer_writes_process_counts(self):
+        with tracked_settings() as settings, usage_dir() as directory:
+            writer = UsageWriter(self.cfg._usage, directory, interval=3600)
+            writer.start()
+            read_setting(settings, "HOT", 2)
+            writer.write()
+            writer.stop()
+            self.assertEqual(read_usage(directory), {"HOT": 2})
+
+    def test_usage_writer_skips_empty_counts(self):
+        with tracked_settings(), usage_dir() as directory:
+            writer = UsageWriter(self.cfg._usage, directory, interval=3600)
+            writer.start()
+            writer.write()
+            writer.stop()
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_read_usage_sums_process_files(self):
+        with usage_dir() as directory:
+            write_usage_file(directory, "1.json", {"HOT": 2})
+            write_usage_file(directory, "2.json", {"HOT": 3})
+            self.assertEqual(read_usage(directory), {"HOT": 5})
+
+    def test_usage_writer_compacts_stale_files(self):
+        with usage_dir() as directory:
+            write_usage_file(directory, "1-1.json", {"HOT": 2}, age=7200)
+            write_usage_file(directory, "2-1.json", {"HOT": 3}, age=7200)
+            UsageWriter(usage.UsageCounter(), directory, interval=60).compact()
+            self.assertEqual(
+                sorted(name for name in os.listdir(directory) if name != ".lock"),
+                ["compacted.json"],
+            )
+
+    def test_usage_writer_compaction_keeps_totals(self):
+        with usage_dir() as directory:
+            write_usage_file(directory, "1-1.json", {"HOT": 2}, age=7200)
+            write_usage_file(directory, "2-1.json", {"HOT": 3})
+            writer = UsageWriter(usage.UsageCounter(), directory, interval=60)
+            writer.compact()
+            write_usage_file(directory, "3-1.json", {"HOT": 4}, age=7200)
+            writer.compact()
+            self.assertEqual(read_usage(directory), {"HOT": 9})
+
+    def test_usage_writer_keeps_recent_files(self):
+        with usage_dir() as directory:
+            write_usage_file(directory, "1-1.json", {"HOT": 2})
+            UsageWriter(usage.UsageCounter(), directory, interval=60).compact()
+            self.assertIn("1-1.json", os.listdir(directory))
+
+    def test_command_usage_reads_usage_dir(self):
+        with tracked_settings(), usage_dir() as directory:
+            write_usage_file(directory, "1.json", {"HOT": 410})
+            with override_settings(CONFIGVARS_USAGE_DIR=directory):
+                output = run_command(usage=True)
+            self.assertEqual(output.splitlines(), ["DEAD = 0", "HOT = 410"])
+
+    def test_command_usage_requires_tracking(self):
+        with wrapper_vars():
+            with self.assertRaises(CommandError):
+                run_command(usage=True)
+
+    def test_config_interpolates_references(self):
+        with interpolation_config({"DB_HOST": "db"}, DB_PORT=5432) as cfg:
+            value = cfg.config("DB_ADDR", "${DB_HOST}:${DB_PORT}", interpolate=True)
+            self.assertEqual(value, "db:5432")
+
+    def test_config_interpolates_nested_references(self):
+        with interpolation_config(
+            {"DB_HOST": "db", "DB_ADDR": "${DB_HOST}:5432"}
+        ) as cfg:
+            cfg.config("DB_ADDR", interpolate=True)
+            value = cfg.config("DB_URL", "pg://${DB_ADDR}/app", interpolate=True)
+            self.assertEqual(value, "pg://db:5432/app")
+
+    def test_config_interpolation_keeps_non_interpolated_reference_verbatim(self):
+        with interpolation_config({"PW": "pa$$word"}) as cfg:
+            cfg.config("PW")
+            value = cfg.config("DSN", "u:${PW}", interpolate=True)
+            self.assertEqual(value, "u:pa$$word")
+
+    def test_config_interpolation_keeps_undeclared_reference_verbatim(self):
+        with interpolation_config(
+            {"DB_HOST": "db", "DB_ADDR": "${DB_HOST}:5432"}
+        ) as cfg:
+            value = cfg.config("DB_URL", "pg://${DB_ADDR}/app", interpolate=True)
+            self.assertEqual(value, "pg://${DB_HOST}:5432/app")
+
+    def test_config_interpolation_expands_reference_declared_later(self):
+        with interpolation_config(
+            {"DB_HOST": "db", "DB_ADDR": "${DB_HOST}:5432"}
+        ) as cfg:
+            cfg.config("DB_URL", "pg://${DB_ADDR}/app", interpolate=True)
+            cfg.config("DB_ADDR", interpolate=True)
+            value = cfg.config("DB_URL", "pg://${DB_ADDR}/app", interpolate=True)
+            self.assertEqual(value, "pg://db:5432/app")
+
+    def test_config_interpolation_uses_redeclared_default(self):
+        with interpolation_config({"H": "h1"}) as cfg:
+            cfg.config("URL", "a-${H}", interpolate=True)
+            self.assertEqual(cfg.config("URL", "b-${H}", interpolate=True), "b-h1")
+
+    def test_config_interpolation_uses_registered_default(self):
+        with interpolation_config() as cfg:
+            cfg.config("DB_HOST", "localhost")
+            value = cfg.config("DB_ADDR", "${DB_HOST}:5432", interpolate=True)
+            self.assertEqual(value, "localhost:5432")
+
+    def test_config_interpolation_escapes_dollar(self):
+        with interpolation_config() as cfg:
+            value = cfg.config("PRICE", "$${AMOUNT}", interpolate=True)
+            self.assertEqual(value, "${AMOUNT}")
+
+    def test_config_without_interpolate_keeps_references(self):
+        with interpolation_config({"DB_HOST": "db"}) as cfg:
+            self.assertEqual(cfg.config("DB_ADDR", "${DB_HOST}"), "${DB_HOST}")
+
+    def test_config_interpolation_detects_cycle(self):
+        with interpolation_config({"A": "${B}", "B": "${A}"}) as cfg:
+            cfg.config("B", interpolate=True)
+            with self.assertRaises(configvars.ImproperlyConfigured):
+                cfg.config("A", interpolate=True)
+
+    def test_config_interpolation_reports_cycle_path(self):
+        with interpolation_config({"A": "${B}", "B": "${A}"}) as cfg:
+            cfg.config("B", interpolate=True)
+            with self.assertRaisesRegex(configvars.ImproperlyConfigured, "A -> B -> A"):
+                cfg.config("A", interpolate=True)
+
+    def test_config_interpolation_raises_for_undefined_reference(self):
+        with interpolation_config() as cfg:
+            with self.assertRaises(configvars.ImproperlyConfigured):
+                cfg.config("DB_ADDR", "${DB_HOST}", interpolate=True)
+
+    def test_config_interpolation_memoizes_shared_dependencies(self):
+        with interpolation_config({"DB_HOST": "db"}) as cfg:
+            cfg.config("DB_ADDR", "${DB_HOST}:5432", interpolate=True)
+            with patch.object(cfg, "_lookup", wraps=cfg._lookup) as lookup_mock:
+                cfg.config("A", "${DB_ADDR}/a", interpolate=True)
+                cfg.config("B", "${DB_ADDR}/b", interpolate=True)
+                calls = [c for c in lookup_mock.call_args_list if c[0][0] == "DB_HOST"]
+                self.assertEqual(len(calls), 0)
+
+    def test_config_interpolation_registers_resolved_value(self):
+        with interpolation_config({"DB_HOST": "db"}) as cfg:
+            cfg.config("DB_ADDR", "${DB_HOST}:5432", interpolate=True)
+            self.assertEqual(list(cfg.config_variables())[0].value, "db:5432")
+
+    def test_config_interpolation_registers_raw_default(self):
+        with interpolation_config({"DB_HOST": "db"}) as cfg:
+            cfg.config("DB_ADDR", "${DB_HOST}:5432", interpolate=True)
+            self.assertEqual(list(cfg.config_variables())[0].default, "${DB_HOST}:5432")
+
+    def test_config_interpolation_masks_secret_dependency(self):
+        with interpolation_config({"DB_PASSWORD": "pw"}) as cfg:
+            cfg.secret("DB_PASSWORD")
+            cfg.config("DB_URL", "pg://u:${DB_PASSWORD}@db", interpolate=True)
+            self.assertEqual(list(cfg.config_variables())[1].value, "*****")
+
+    def test_config_interpolation_returns_secret_dependency(self):
+        with interpolation_config({"DB_PASSWORD": "pw"}) as cfg:
+            cfg.secret("DB_PASSWORD")
+            value = cfg.config("DB_URL", "pg://u:${DB_PASSWORD}@db", interpolate=True)
+            self.assertEqual(value, "pg://u:pw@db")
+
+    def test_config_interpolation_reads_secret_file_reference(self):
+        with interpolation_config() as cfg, secret_file("pw") as path:
+            os.environ["DB_PASSWORD_FILE"] = path
+            cfg.secret("DB_PASSWORD", file_var="DB_PASSWORD_FILE")
+            value = cfg.config("DSN", "u:${DB_PASSWORD}@h", interpolate=True)
+            self.assertEqual(value, "u:pw@h")
+
+    def test_config_interpolation_masks_secret_file_reference(self):
+        with interpolation_config() as cfg, secret_file("pw") as path:
+            os.environ["DB_PASSWORD_FILE"] = path
+            cfg.secret("DB_PASSWORD", file_var="DB_PASSWORD_FILE")
+            cfg.config("DSN", "u:${DB_PASSWORD}@h", interpolate=True)
+            self.assertEqual(cfg._all_configvars["DSN"].value, "*****")
+
+    def test_config_interpolation_uses_secret_default(self):
+        with interpolation_config() as cfg:
+            cfg.secret("DB_PASSWORD", "dev")
+            value = cfg.config("DSN", "u:${DB_PASSWORD}@h", interpolate=True)
+            self.assertEqual(value, "u:dev@h")
+
+    def test_restore_drops_variables_registered_after_snapshot(self):
+        with snapshot_config() as (cfg, token):
+            cfg.config("BAR")
+            cfg.restore(token)
+            self.assertEqual(registry_names(cfg), ["FOO"])
+
+    def test_restore_restores_overwritten_variable(self):
+        with snapshot_config() as (cfg, token):
+            cfg.config("FOO", "other")
+            cfg.restore(token)
+            self.assertEqual(list(cfg.config_variables())[0].default, "default")
+
+    def test_restore_restores_initialize_state(self):
+        with snapshot_config() as (cfg, token):
+            cfg._reset_state()
+            cfg.restore(token)
+            self.assertEqual(cfg.ENV_PREFIX, "APP_")
+
+    def test_restore_keeps_local_settings(self):
+        with snapshot_config() as (cfg, token):
+            cfg._reset_state()
+            cfg.restore(token)
+            self.assertEqual(cfg.local("FOO"), "local")
+
+    def test_restore_token_is_reusable(self):
+        with snapshot_config() as (cfg, token):
+            cfg.config("BAR")
+            cfg.restore(token)
+            cfg.config("BAZ")
+            cfg.restore(token)
+            self.assertEqual(registry_names(cfg), ["FOO"])
+
+    def test_restore_clears_deprecated_names(self):
+        with aliased_config({"LEGACY_FOO": "legacy"}) as cfg:
+            token = cfg.snapshot()
+            cfg.config("FOO")
+            cfg.restore(token)
+            self.assertEqual(cfg.deprecated_names(), {})
+
+    def test_restore_clears_secret_file_reads(self):
+        with snapshot_config() as (cfg, token), secret_file("s3cret") as path:
+            os.environ["TOKEN_FILE"] = path
+            cfg.secret(file_var="TOKEN_FILE")
+            cfg.restore(token)
+            self.assertEqual(cfg.secret_file_reads(), {})
+
+    def test_restore_clears_secret_hashes(self):
+        with snapshot_config() as (cfg, token):
+            os.environ["APP_TOKEN"] = "s3cret"
+            cfg.secret("TOKEN")
+            cfg.restore(token)
+            self.assertIsNone(cfg.secret_digest("TOKEN", b"key"))
+
+    def test_pytest_fixture_restores_config_after_test(self):
+        from configvars import pytest_plugin
+
+        with snapshot_config() as (cfg, _):
+            fixture = pytest_plugin.configvars_state.__wrapped__()
+            next(fixture).config("BAR")
+            next(fixture, None)
+            self.assertEqual(registry_names(cfg), ["FOO"])
+
+    def test_snapshot_keeps_registration_order(self):
+        with snapshot_config() as (cfg, _):
+            cfg.config("BAR")
+            cfg.config("FOO", "other")
+            self.assertEqual(registry_names(cfg), ["FOO", "BAR"])
+
+    def test_state_mixin_restores_config_after_test(self):
+        class SampleTest(ConfigVarsStateMixin, unittest.TestCase):
+            def test_register(self):
+                configvars.default_config.config("MIXIN")
+
+        with snapshot_config() as (cfg, _):
+            unittest.TestSuite([SampleTest("test_register")]).run(unittest.TestResult())
+            self.assertEqual(registry_names(cfg), ["FOO"])
+
+    def test_concurrent_first_access_initializes_once(self):
+        with lazy_settings_env({"DJANGO_SETTINGS_MODULE": "lazyproj.settings"}):
+            with patch.object(
+                self.cfg, "_initialize", wraps=self.cfg._initialize
+            ) as initialize_mock:
+                run_in_threads(lambda index: self.cfg.config("FOO"))
+                self.assertEqual(initialize_mock.call_count, 1)
+
+    def test_concurrent_registrations_are_kept(self):
+        with wrapper_vars():
+
+            def register(index):
+                for number in range(100):
+                    self.cfg.config(f"VAR_{index}_{number}")
+
+            run_in_threads(register)
+            self.assertEqual(len(list(self.cfg.config_variables())), 801)
+
+    def test_initialized_path_does_not_acquire_lock(self):
+        with wrapper_vars():
+            with patch.object(self.cfg, "_lock", MagicMock()) as lock_mock:
+                self.cfg.env("FOO")
+                self.cfg.local("FOO")
+                self.cfg.config("FOO")
+                self.cfg.secret("TOKEN")
+                self.assertFalse(lock_mock.__enter__.called)
+
+    def test_local_layers_later_module_overrides(self):
+        with layered_config(
+            local_settings_module=["layproj.local", "layproj.local_prod"]
+        ) as cfg:
+            self.assertEqual(cfg.config("FOO"), "prod")
+
+    def test_local_layers_keep_base_value(self):
+        with layered_config(
+            local_settings_module=["layproj.local", "layproj.local_prod"]
+        ) as cfg:
+            self.assertEqual(cfg.config("BAR"), "base")
+
+    def test_profile_selects_overlay_module(self):
+        with layered_config(
+            local_settings_module="layproj.local", profile="prod"
+        ) as cfg:
+            self.assertEqual(cfg.config("FOO"), "prod")
+
+    def test_profile_env_variable_selects_overlay_module(self):
+        with layered_config(
+            {"CONFIGVARS_PROFILE": "prod"}, local_settings_module="layproj.local"
+        ) as cfg:
+            self.assertEqual(cfg.config("FOO"), "prod")
+
+    def test_profile_requires_overlay_module(self):
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            with layered_config(local_settings_module="layproj.local", profile="qa"):
+                pass
+
+    def test_local_layers_require_explicit_modules(self):
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            with layered_config(local_settings_module=["layproj.local", "missing.x"]):
+                pass
+
+    def test_config_registers_local_layer_source(self):
+        with layered_config(local_settings_module="layproj.local", profile="prod"):
+            configvars.config("FOO")
+            var = list(configvars.get_config_variables())[0]
+            self.assertEqual(var.source, "layproj.local_prod")
+
+    def test_config_registers_env_source(self):
+        with layered_config({"FOO": "env"}, local_settings_module="layproj.local"):
+            configvars.config("FOO")
+            var = list(configvars.get_config_variables())[0]
+            self.assertEqual(var.source, "env")
+
+    def test_config_registers_default_source(self):
+        with layered_config(local_settings_module="layproj.local"):
+            configvars.config("OTHER", "default")
+            var = list(configvars.get_config_variables())[0]
+            self.assertEqual(var.source, "default")
+
+    def test_secret_registers_source(self):
+        with layered_config(local_settings_module="layproj.local"):
+            configvars.secret("FOO")
+            var = list(configvars.get_config_variables())[0]
+            self.assertEqual(var.source, "layproj.local")
+
+    def test_command_sources_prints_layer(self):
+        with layered_config(local_settings_module="layproj.local", profile="prod"):
+            configvars.config("FOO", desc="desc")
+            output = run_command(comments=True, sources=True)
+            self.assertEqual(
+                output.strip(), "FOO = 'prod'  # desc; from layproj.local_prod"
+            )
+
+    def test_config_prefers_primary_prefix(self):
+        with aliased_config({"APP_FOO": "app", "LEGACY_FOO": "legacy"}):
+            self.assertEqual(configvars.config("FOO"), "app")
+
+    def test_config_reads_fallback_prefix(self):
+        with aliased_config({"LEGACY_FOO": "legacy"}):
+            self.assertEqual(configvars.config("FOO"), "legacy")
+
+    def test_config_reads_fallback_prefixes_in_order(self):
+        with aliased_config({"LEGACY_FOO": "legacy", "OLD_FOO": "old"}):
+            self.assertEqual(configvars.config("FOO"), "legacy")
+
+    def test_config_reads_alias(self):
+        with aliased_config({"APP_OLD_NAME": "old"}):
+            self.assertEqual(configvars.config("FOO", aliases=["OLD_NAME"]), "old")
+
+    def test_config_reads_alias_under_fallback_prefix(self):
+        with aliased_config({"OLD_OLD_NAME": "old"}):
+            self.assertEqual(configvars.config("FOO", aliases=["OLD_NAME"]), "old")
+
+    def test_config_prefers_name_over_alias(self):
+        with aliased_config({"APP_FOO": "new", "APP_OLD_NAME": "old"}):
+            self.assertEqual(configvars.config("FOO", aliases=["OLD_NAME"]), "new")
+
+    def test_config_reads_local_alias(self):
+        with aliased_config(OLD_NAME="local"):
+            self.assertEqual(configvars.config("FOO", aliases=["OLD_NAME"]), "local")
+
+    def test_env_alias_beats_local_value(self):
+        with aliased_config({"LEGACY_FOO": "legacy"}, FOO="local"):
+            self.assertEqual(configvars.config("FOO"), "legacy")
+
+    def test_fallback_prefix_index_is_built_once(self):
+        with aliased_config({"LEGACY_FOO": "legacy"}):
+            os.environ["LEGACY_FOO"] = "changed"
+            self.assertEqual(configvars.config("FOO"), "legacy")
+
+    def test_secret_reads_alias(self):
+        with aliased_config({"APP_OLD_TOKEN": "s3cret"}):
+            self.assertEqual(
+                configvars.secret("TOKEN", aliases=["OLD_TOKEN"]), "s3cret"
+            )
+
+    def test_env_reads_fallback_prefix(self):
+        with aliased_config({"LEGACY_FOO": "legacy"}) as cfg:
+            self.assertEqual(cfg.env("FOO"), "legacy")
+
+    def test_config_registers_aliases(self):
+        with aliased_config():
+            configvars.config("FOO", aliases=["OLD_NAME"])
+            var = list(configvars.get_config_variables())[0]
+            self.assertEqual(var.aliases, ("OLD_NAME",))
+
+    def test_alias_is_not_unknown_env_variable(self):
+        with aliased_config({"APP_OLD_NAME": "old"}) as cfg:
+            configvars.config("FOO", aliases=["OLD_NAME"])
+            self.assertEqual(cfg.unknown_env_variables(), [])
+
+    def test_deprecated_names_are_collected(self):
+        with aliased_config({"LEGACY_FOO": "1", "APP_OLD_BAR": "2"}) as cfg:
+            configvars.config("FOO")
+            configvars.config("BAR", aliases=["OLD_BAR"])
+            self.assertEqual(
+                cfg.deprecated_names(),
+                {"APP_OLD_BAR": "APP_BAR", "LEGACY_FOO": "APP_FOO"},
+            )
+
+    def test_current_names_are_not_deprecated(self):
+        with aliased_config({"APP_FOO": "1"}) as cfg:
+            configvars.config("FOO", aliases=["OLD_FOO"])
+            self.assertEqual(cfg.deprecated_names(), {})
+
+    def test_check_deprecated_names_aggregates_warnings(self):
+        from configvars.apps import check_deprecated_names
+
+        with aliased_config({"LEGACY_FOO": "1", "APP_OLD_BAR": "2"}):
+            configvars.config("FOO")
+            configvars.config("BAR", aliases=["OLD_BAR"])
+            warnings = check_deprecated_names(None)
+            self.assertEqual(len(warnings), 1)
+
+    def test_check_deprecated_names_lists_renames(self):
+        from configvars.apps import check_deprecated_names
+
+        with aliased_config({"LEGACY_FOO": "1", "APP_OLD_BAR": "2"}):
+            configvars.config("FOO")
+            configvars.config("BAR", aliases=["OLD_BAR"])
+            self.assertEqual(
+                check_deprecated_names(None)[0].msg,
+                "Deprecated config variable names are used: "
+                "`APP_OLD_BAR` -> `APP_BAR`, `LEGACY_FOO` -> `APP_FOO`.",
+            )
+
+    def test_check_deprecated_names_without_deprecated_names(self):
+        from configvars.apps import check_deprecated_names
+
+        with aliased_config({"APP_FOO": "1"}):
+            configvars.config("FOO")
+            self.assertEqual(check_deprecated_names(None), [])
+
+    def test_appconfig_ready_logs_deprecated_names_once(self):
+        from configvars import apps as config_apps
+
+        with aliased_config({"LEGACY_FOO": "1"}):
+            configvars.config("FOO")
+            with patch.object(config_apps, "register"):
+                with self.assertLogs("configvars", "WARNING") as logs:
+                    config_apps.ConfigVarsAppConfig("configvars", config_apps).ready()
+            self.assertEqual(len(logs.output), 1)
+
+    def test_primary_prefix_alias_is_indexed_at_initialize(self):
+        with aliased_config({"APP_OLD_FOO": "old"}):
+            os.environ["APP_OLD_FOO"] = "changed"
+            self.assertEqual(configvars.config("FOO", aliases=["OLD_FOO"]), "old")
+
+    def test_primary_name_is_read_at_declaration(self):
+        with aliased_config({"APP_FOO": "initial"}):
+            os.environ["APP_FOO"] = "changed"
+            self.assertEqual(configvars.config("FOO"), "changed")
+
+    def test_aliases_are_read_from_env_index(self):
+        with aliased_config({"APP_OLD_NAME": "old"}):
+            with patch.object(os, "getenv", wraps=os.getenv) as getenv_mock:
+                configvars.config("FOO", aliases=["OLD_NAME", "OLDER_NAME"])
+                self.assertEqual(getenv_mock.call_count, 1)
+
+
+class ImportTimeTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.result = import_configvars_in_subprocess()
+
+    def test_import_does_not_load_heavy_modules(self):
+        self.assertEqual(self.result.stdout.strip(), "")
+
+    def test_import_time_stays_under_budget(self):
+        self.assertLess(
+            cumulative_import_time(self.result.stderr, "configvars"),
+            IMPORT_TIME_BUDGET_US,
+        )
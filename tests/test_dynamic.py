@@ -0,0 +1,146 @@
+import os
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import django
+from django.conf import settings
+from django.core.management import call_command
+from django.db import DatabaseError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from test_configvars import run_in_threads, temporary_module
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=["configvars", "configvars.dynamic"],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+    )
+    django.setup()
+
+import configvars  # noqa: E402
+from configvars.dynamic import DynamicOverrides  # noqa: E402
+from configvars.dynamic.models import Override, OverridesVersion  # noqa: E402
+
+
+@contextmanager
+def dynamic_config(ttl=0):
+    with temporary_module("dynproj.local"):
+        cfg = configvars.default_config
+        with patch.dict(os.environ, {}, clear=True):
+            cfg.initialize(local_settings_module="dynproj.local")
+            cfg.config("THRESHOLD", 10, dynamic=True)
+            cfg.config("STATIC", "static")
+            yield DynamicOverrides(cfg, ttl=ttl)
+
+
+class DynamicOverridesTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        call_command("migrate", verbosity=0)
+
+    def setUp(self):
+        configvars.default_config._reset_state()
+        Override.objects.all().delete()
+
+    def test_get_returns_static_value_without_override(self):
+        with dynamic_config() as overrides:
+            self.assertEqual(overrides.get("THRESHOLD"), 10)
+
+    def test_get_returns_override(self):
+        with dynamic_config() as overrides:
+            Override.objects.create(name="THRESHOLD", value=20)
+            self.assertEqual(overrides.get("THRESHOLD"), 20)
+
+    def test_get_sees_updated_override(self):
+        with dynamic_config() as overrides:
+            override = Override.objects.create(name="THRESHOLD", value=20)
+            overrides.get("THRESHOLD")
+            override.value = 30
+            override.save()
+            self.assertEqual(overrides.get("THRESHOLD"), 30)
+
+    def test_get_falls_back_after_override_deleted(self):
+        with dynamic_config() as overrides:
+            Override.objects.create(name="THRESHOLD", value=20)
+            overrides.get("THRESHOLD")
+            Override.objects.all().delete()
+            self.assertEqual(overrides.get("THRESHOLD"), 10)
+
+    def test_get_skips_queries_within_ttl(self):
+        with dynamic_config(ttl=60) as overrides:
+            overrides.get("THRESHOLD")
+            with CaptureQueriesContext(connection) as queries:
+                overrides.get("THRESHOLD")
+            self.assertEqual(len(queries), 0)
+
+    def test_get_checks_version_with_single_query(self):
+        with dynamic_config() as overrides:
+            overrides.get("THRESHOLD")
+            with CaptureQueriesContext(connection) as queries:
+                overrides.get("THRESHOLD")
+            self.assertEqual(len(queries), 1)
+
+    def test_get_raises_for_non_dynamic_variable(self):
+        with dynamic_config() as overrides:
+            with self.assertRaises(configvars.ImproperlyConfigured):
+                overrides.get("STATIC")
+
+    def test_saving_override_bumps_version(self):
+        version = OverridesVersion.current()
+        Override.objects.create(name="THRESHOLD", value=20)
+        self.assertEqual(OverridesVersion.current(), version + 1)
+
+    def test_queryset_update_bumps_version(self):
+        Override.objects.create(name="THRESHOLD", value=20)
+        version = OverridesVersion.current()
+        Override.objects.filter(name="THRESHOLD").update(value=30)
+        self.assertEqual(OverridesVersion.current(), version + 1)
+
+    def test_bulk_create_bumps_version(self):
+        version = OverridesVersion.current()
+        Override.objects.bulk_create([Override(name="THRESHOLD", value=20)])
+        self.assertEqual(OverridesVersion.current(), version + 1)
+
+    def test_get_sees_bulk_update(self):
+        with dynamic_config() as overrides:
+            override = Override.objects.create(name="THRESHOLD", value=20)
+            overrides.get("THRESHOLD")
+            override.value = 30
+            Override.objects.bulk_update([override], ["value"])
+            self.assertEqual(overrides.get("THRESHOLD"), 30)
+
+    def test_get_returns_static_value_if_database_fails(self):
+        with dynamic_config() as overrides:
+            with patch.object(overrides, "_refresh", side_effect=DatabaseError):
+                with self.assertLogs("configvars", "WARNING"):
+                    self.assertEqual(overrides.get("THRESHOLD"), 10)
+
+    def test_get_keeps_last_values_if_database_fails(self):
+        with dynamic_config() as overrides:
+            Override.objects.create(name="THRESHOLD", value=20)
+            overrides.get("THRESHOLD")
+            with patch.object(
+                OverridesVersion, "current", side_effect=DatabaseError
+            ), self.assertLogs("configvars", "WARNING"):
+                self.assertEqual(overrides.get("THRESHOLD"), 20)
+
+    def test_refresh_uses_savepoint_inside_transaction(self):
+        with dynamic_config() as overrides, transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                overrides.get("THRESHOLD")
+            self.assertIn("SAVEPOINT", queries[0]["sql"])
+
+    def test_refresh_is_not_repeated_by_waiting_threads(self):
+        with dynamic_config(ttl=60) as overrides:
+            with patch.object(
+                overrides, "_refresh", wraps=overrides._refresh
+            ) as refresh_mock:
+                run_in_threads(lambda index: overrides.get("THRESHOLD"))
+                self.assertEqual(refresh_mock.call_count, 1)
+
+    def test_config_registers_dynamic_flag(self):
+        with dynamic_config():
+            variables = list(configvars.get_config_variables())
+            self.assertTrue(variables[0].dynamic)
@@ -0,0 +1,212 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from contextlib import contextmanager
+from unittest.mock import Mock, patch
+
+from test_configvars import secret_file, temporary_module
+
+import configvars
+
+CHILD = """
+import configvars
+
+configvars.initialize(local_settings_module="missing.module")
+print(configvars.config("FOO"), configvars.secret(file_var="TOKEN_FILE"))
+"""
+
+
+@contextmanager
+def parent_config(providers=None, **local):
+    local = {"FOO": "local", "API_KEY": "k3y", **local}
+    with temporary_module("exportproj.local", **local):
+        with secret_file("s3cret") as path:
+            with patch.dict(os.environ, {"TOKEN_FILE": path}, clear=True):
+                cfg = configvars.Config()
+                cfg.initialize(
+                    local_settings_module="exportproj.local", providers=providers
+                )
+                cfg.config("FOO", "default")
+                cfg.secret("API_KEY")
+                cfg.secret(file_var="TOKEN_FILE")
+                yield cfg
+
+
+@contextmanager
+def child_config(environ):
+    with patch.dict(os.environ, environ, clear=True):
+        cfg = configvars.Config()
+        cfg.initialize(local_settings_module="missing.module")
+        yield cfg
+
+
+def exported(include_secrets=False, **local):
+    with parent_config(**local) as cfg:
+        return {**os.environ, **cfg.export_environment(include_secrets)}
+
+
+class ExportEnvironmentTests(unittest.TestCase):
+    def test_payload_contains_resolved_value(self):
+        payload = json.loads(exported()[configvars.PAYLOAD_ENV_VAR])
+        self.assertEqual(payload["values"]["FOO"], ["local", "exportproj.local"])
+
+    def test_payload_omits_secret_values(self):
+        payload = json.loads(exported()[configvars.PAYLOAD_ENV_VAR])
+        self.assertNotIn("API_KEY", payload["values"])
+
+    def test_payload_omits_descriptor_without_secrets(self):
+        self.assertNotIn(configvars.PAYLOAD_FD_ENV_VAR, exported())
+
+    def test_payload_omits_non_json_value(self):
+        with parent_config() as cfg:
+            cfg._values["FOO"] = (object(), "exportproj.local")
+            payload = json.loads(cfg.export_environment()[configvars.PAYLOAD_ENV_VAR])
+            self.assertNotIn("FOO", payload["values"])
+
+    def test_payload_omits_value_changed_by_json(self):
+        with parent_config(FOO=("a", "b")) as cfg:
+            payload = json.loads(cfg.export_environment()[configvars.PAYLOAD_ENV_VAR])
+            self.assertNotIn("FOO", payload["values"])
+
+    def test_child_imports_local_settings_for_omitted_value(self):
+        with parent_config(FOO=("a", "b")) as cfg:
+            with child_config({**os.environ, **cfg.export_environment()}) as child:
+                self.assertEqual(child.config("FOO"), ("a", "b"))
+
+    def test_child_imports_local_settings_for_omitted_secret(self):
+        with parent_config() as cfg:
+            with child_config({**os.environ, **cfg.export_environment()}) as child:
+                self.assertEqual(child.secret("API_KEY"), "k3y")
+
+    def test_child_imports_local_settings_for_undeclared_variable(self):
+        with parent_config(BAR="local") as cfg:
+            with child_config({**os.environ, **cfg.export_environment()}) as child:
+                self.assertEqual(child.config("BAR"), "local")
+
+    def test_child_imports_local_settings_once(self):
+        with parent_config(BAR="local", BAZ="local") as cfg:
+            with child_config({**os.environ, **cfg.export_environment()}) as child:
+                child.config("BAR")
+                with patch.object(child, "_import_local_module") as import_mock:
+                    child.config("BAZ")
+                    self.assertFalse(import_mock.called)
+
+    def test_restore_undoes_local_settings_import(self):
+        with parent_config(BAR="local") as cfg:
+            with child_config({**os.environ, **cfg.export_environment()}) as child:
+                token = child.snapshot()
+                child.config("BAR")
+                child.restore(token)
+                self.assertNotIn("BAR", child._values)
+
+    def test_child_raises_for_omitted_remote_secret(self):
+        provider = Mock(fetch=Mock(return_value={"REMOTE_KEY": "r3mote"}))
+        with parent_config(providers=[provider]) as cfg:
+            cfg.secret("REMOTE_KEY")
+            with child_config({**os.environ, **cfg.export_environment()}) as child:
+                with self.assertRaises(configvars.ImproperlyConfigured):
+                    child.secret("REMOTE_KEY")
+
+    def test_child_reads_remote_secret_from_descriptor(self):
+        provider = Mock(fetch=Mock(return_value={"REMOTE_KEY": "r3mote"}))
+        with parent_config(providers=[provider]) as cfg:
+            cfg.secret("REMOTE_KEY")
+            environ = {**os.environ, **cfg.export_environment(include_secrets=True)}
+            with child_config(environ) as child:
+                self.assertEqual(child.secret("REMOTE_KEY"), "r3mote")
+
+    def test_child_skips_local_settings_import(self):
+        with child_config(exported()) as cfg:
+            self.assertEqual(cfg.config("FOO"), "local")
+
+    def test_child_keeps_source(self):
+        with child_config(exported()) as cfg:
+            cfg.config("FOO")
+            self.assertEqual(cfg._all_configvars["FOO"].source, "exportproj.local")
+
+    def test_child_reads_secret_value_from_descriptor(self):
+        with child_config(exported(include_secrets=True)) as cfg:
+            self.assertEqual(cfg.secret("API_KEY"), "k3y")
+
+    def test_child_reads_secret_file_from_descriptor(self):
+        environ = exported(include_secrets=True)
+        with child_config(environ) as cfg:
+            with patch.object(cfg, "_read_secret_file") as read_mock:
+                cfg.secret(file_var="TOKEN_FILE")
+                self.assertFalse(read_mock.called)
+
+    def test_child_returns_secret_file_content(self):
+        with child_config(exported(include_secrets=True)) as cfg:
+            self.assertEqual(cfg.secret(file_var="TOKEN_FILE"), "s3cret")
+
+    def test_child_checks_secret_file_lines(self):
+        environ = exported(include_secrets=True)
+        with child_config(environ) as cfg:
+            cfg._payload_files["TOKEN_FILE"] = "YQpi"
+            with self.assertRaises(configvars.ImproperlyConfigured):
+                cfg.secret(file_var="TOKEN_FILE")
+
+    def test_child_consumes_payload_variable(self):
+        with child_config(exported()):
+            self.assertNotIn(configvars.PAYLOAD_ENV_VAR, os.environ)
+
+    def test_child_raises_for_drained_pipe(self):
+        with patch.object(configvars.os, "memfd_create", None, create=True):
+            environ = exported(include_secrets=True)
+        # read by a first child, so the next one finds the pipe empty
+        with open(int(environ[configvars.PAYLOAD_FD_ENV_VAR]), closefd=False) as f:
+            f.read()
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            with child_config(environ):
+                pass
+
+    def test_child_raises_for_invalid_payload(self):
+        read, write = os.pipe()
+        os.write(write, b"{}")
+        os.close(write)
+        environ = {**exported(), configvars.PAYLOAD_FD_ENV_VAR: str(read)}
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            with child_config(environ):
+                pass
+
+    def test_child_reads_secret_value_from_pipe(self):
+        with patch.object(configvars.os, "memfd_create", None, create=True):
+            environ = exported(include_secrets=True)
+        with child_config(environ) as cfg:
+            self.assertEqual(cfg.secret("API_KEY"), "k3y")
+
+    @unittest.skipUnless(hasattr(os, "memfd_create"), "requires memfd_create()")
+    def test_descriptor_is_in_memory_file(self):
+        with parent_config() as cfg:
+            environ = cfg.export_environment(include_secrets=True)
+        fd = int(environ[configvars.PAYLOAD_FD_ENV_VAR])
+        try:
+            self.assertTrue(os.readlink(f"/proc/self/fd/{fd}").startswith("/memfd:"))
+        finally:
+            os.close(fd)
+
+    def test_child_consumes_descriptor_variable(self):
+        with child_config(exported(include_secrets=True)):
+            self.assertNotIn(configvars.PAYLOAD_FD_ENV_VAR, os.environ)
+
+    def test_subprocess_uses_payload(self):
+        with parent_config() as cfg:
+            environ = cfg.export_environment(include_secrets=True)
+            fd = int(environ[configvars.PAYLOAD_FD_ENV_VAR])
+            path = os.environ["TOKEN_FILE"]
+        try:
+            output = subprocess.check_output(
+                [sys.executable, "-c", CHILD],
+                env={
+                    **os.environ,
+                    **environ,
+                    "TOKEN_FILE": path,
+                    "PYTHONPATH": os.pathsep.join(sys.path),
+                },
+                pass_fds=[fd],
+            )
+        finally:
+            os.close(fd)
+        self.assertEqual(output.decode().split(), ["local", "s3cret"])
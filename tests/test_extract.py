@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import textwrap
+import unittest
+from contextlib import redirect_stdout
+from unittest.mock import patch
+
+from configvars import extract
+
+BASE = """
+import configvars as cv
+
+DEBUG = cv.config("DEBUG", False, desc="Debug mode")
+"""
+
+SETTINGS = """
+import os
+
+from configvars import config, secret as configvars_secret
+
+from .base import *
+
+raise RuntimeError("settings must not be executed")
+
+DATABASES = {
+    "default": {
+        "HOST": config("DB_HOST", "localhost"),
+        "PORT": config("DB_PORT", int(os.getenv("PORT", 5432))),
+        "PASSWORD": configvars_secret("DB_PASSWORD", file_var="DB_PASSWORD_FILE"),
+    }
+}
+LIMIT = config("LIMIT", 10, dynamic=True)
+DSN = config("DSN", "db://${DB_HOST}", interpolate=True)
+"""
+
+
+class ExtractTests(unittest.TestCase):
+    def setUp(self):
+        extract._cache.clear()
+        self.tmpdir = tempfile.mkdtemp()
+        self.package = os.path.join(self.tmpdir, "proj")
+        os.mkdir(self.package)
+        self.write("__init__.py", "")
+        self.write("base.py", BASE)
+        self.settings = self.write("settings.py", SETTINGS)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def write(self, name, source):
+        path = os.path.join(self.package, name)
+        with open(path, "w") as f:
+            f.write(textwrap.dedent(source))
+        return path
+
+    def variables(self, **kwargs):
+        return {
+            var.name: var
+            for var in extract.extract_config_variables(self.settings, **kwargs)
+        }
+
+    def test_extracts_names_in_declaration_order(self):
+        names = [var.name for var in extract.extract_config_variables(self.settings)]
+        self.assertEqual(
+            names, ["DEBUG", "DB_HOST", "DB_PORT", "DB_PASSWORD", "LIMIT", "DSN"]
+        )
+
+    def test_skips_imports_when_disabled(self):
+        self.assertNotIn("DEBUG", self.variables(follow_imports=False))
+
+    def test_extracts_literal_default(self):
+        self.assertEqual(self.variables()["DB_HOST"].default, "localhost")
+
+    def test_extracts_expression_default_as_source(self):
+        self.assertEqual(
+            self.variables()["DB_PORT"].default.source, 'int(os.getenv("PORT", 5432))'
+        )
+
+    def test_marks_expression_default(self):
+        self.assertIsInstance(self.variables()["DB_PORT"].default, extract.Expression)
+
+    def test_keeps_string_default_unmarked(self):
+        self.write("settings.py", "from configvars import config\nconfig('X', 'a')\n")
+        self.assertEqual(type(self.variables()["X"].default), str)
+
+    def test_extracts_desc(self):
+        self.assertEqual(self.variables()["DEBUG"].desc, "Debug mode")
+
+    def test_extracts_secret_flag(self):
+        self.assertTrue(self.variables()["DB_PASSWORD"].secret)
+
+    def test_extracts_file_var(self):
+        self.assertEqual(self.variables()["DB_PASSWORD"].file_var, "DB_PASSWORD_FILE")
+
+    def test_extracts_dynamic_flag(self):
+        self.assertTrue(self.variables()["LIMIT"].dynamic)
+
+    def test_extracts_interpolate_flag(self):
+        self.assertTrue(self.variables()["DSN"].interpolate)
+
+    def test_interpolate_flag_defaults_to_false(self):
+        self.assertFalse(self.variables()["DB_HOST"].interpolate)
+
+    def test_keeps_expression_default_without_source_segments(self):
+        with patch.object(extract.ast, "get_source_segment", None, create=True):
+            default = self.variables()["DB_PORT"].default
+        self.assertIsInstance(default, extract.Expression)
+
+    def test_keeps_literal_default_without_source_segments(self):
+        with patch.object(extract.ast, "get_source_segment", None, create=True):
+            self.assertEqual(self.variables()["DB_HOST"].default, "localhost")
+
+    def test_value_is_default(self):
+        self.assertEqual(self.variables()["DB_HOST"].value, "localhost")
+
+    def test_ignores_unrelated_calls(self):
+        self.write("settings.py", "def config(*args):\n    pass\n\nconfig('X')\n")
+        self.assertEqual(self.variables(), {})
+
+    def test_reuses_parse_results_for_same_file_hash(self):
+        extract.extract_config_variables(self.settings)
+        with patch.object(extract, "parse_source") as parse_mock:
+            extract.extract_config_variables(self.settings)
+            self.assertFalse(parse_mock.called)
+
+    def test_reuses_cache_dir_results(self):
+        cache_dir = os.path.join(self.tmpdir, "cache")
+        extract.extract_config_variables(self.settings, cache_dir=cache_dir)
+        extract._cache.clear()
+        with patch.object(extract, "parse_source") as parse_mock:
+            extract.extract_config_variables(self.settings, cache_dir=cache_dir)
+            self.assertFalse(parse_mock.called)
+
+    def test_main_outputs_json(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            extract.main([self.settings, "--json"])
+        self.assertEqual(json.loads(output.getvalue())[0]["name"], "DEBUG")
+
+    def test_main_flags_expression_default_in_json(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            extract.main([self.settings, "--json"])
+        data = {var["name"]: var for var in json.loads(output.getvalue())}
+        self.assertEqual(
+            (data["DB_PORT"]["expression"], data["DB_HOST"]["expression"]),
+            (True, False),
+        )
+
+    def test_main_reports_interpolate_in_json(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            extract.main([self.settings, "--json"])
+        data = {var["name"]: var for var in json.loads(output.getvalue())}
+        self.assertTrue(data["DSN"]["interpolate"])
+
+    def test_main_prints_expression_unquoted(self):
+        output = io.StringIO()
+        with redirect_stdout(output):
+            extract.main([self.settings])
+        self.assertIn('DB_PORT = int(os.getenv("PORT", 5432))\n', output.getvalue())
@@ -0,0 +1,223 @@
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import django
+from django.conf import settings
+from django.core.management.base import CommandError
+from django.test.utils import override_settings
+from test_configvars import run_command, temporary_module
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=["configvars", "configvars.dynamic"],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+    )
+    django.setup()
+
+import configvars  # noqa: E402
+from configvars import history  # noqa: E402
+
+
+def variable(name="FOO", value="one", source="env", **kwargs):
+    return configvars.ConfigVariable(name=name, value=value, source=source, **kwargs)
+
+
+def digest_of(value):
+    return lambda name, key: configvars._digest(value, key)
+
+
+class HistoryTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "history.sqlite3")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def count(self, table):
+        with sqlite3.connect(self.path) as connection:
+            return connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_first_recording_stores_all_variables(self):
+        self.assertEqual(
+            history.record([variable(), variable("BAR")], self.path, recorded_at=1), 2
+        )
+
+    def test_unchanged_recording_stores_nothing(self):
+        history.record([variable()], self.path, recorded_at=1)
+        history.record([variable()], self.path, recorded_at=2)
+        self.assertEqual(self.count("runs"), 1)
+
+    def test_stores_only_changed_variables(self):
+        history.record([variable(), variable("BAR")], self.path, recorded_at=1)
+        history.record([variable(value="two"), variable("BAR")], self.path)
+        self.assertEqual(self.count("changes"), 3)
+
+    def test_source_change_is_recorded(self):
+        history.record([variable()], self.path, recorded_at=1)
+        self.assertEqual(
+            history.record([variable(source="default")], self.path, recorded_at=2), 1
+        )
+
+    def test_removed_variable_is_recorded(self):
+        history.record([variable(), variable("BAR")], self.path, recorded_at=1)
+        history.record([variable()], self.path, recorded_at=2)
+        self.assertTrue(history.history(self.path, "BAR")[-1].removed)
+
+    def test_history_lists_values_oldest_first(self):
+        history.record([variable()], self.path, recorded_at=1)
+        history.record([variable(value="two")], self.path, recorded_at=2)
+        values = [entry.value for entry in history.history(self.path, "FOO")]
+        self.assertEqual(values, ['"one"', '"two"'])
+
+    def test_secret_value_is_not_stored(self):
+        secret = variable(
+            value=configvars.MASKED_SECRET_VALUE, secret=True, digest="abc"
+        )
+        history.record([secret], self.path, recorded_at=1)
+        self.assertIsNone(history.history(self.path, "FOO")[0].value)
+
+    def test_secret_digest_is_stored(self):
+        secret = variable(
+            value=configvars.MASKED_SECRET_VALUE, secret=True, digest="abc"
+        )
+        history.record([secret], self.path, recorded_at=1)
+        self.assertEqual(history.history(self.path, "FOO")[0].digest, "abc")
+
+    def test_secret_rotation_is_recorded(self):
+        history.record([variable(secret=True, digest="abc")], self.path, recorded_at=1)
+        self.assertEqual(
+            history.record(
+                [variable(secret=True, digest="def")], self.path, recorded_at=2
+            ),
+            1,
+        )
+
+    def test_secret_digest_is_keyed_with_file_salt(self):
+        secret = variable(value=configvars.MASKED_SECRET_VALUE, secret=True)
+        history.record(
+            [secret], self.path, recorded_at=1, secret_digest=digest_of("pw")
+        )
+        with sqlite3.connect(self.path) as connection:
+            salt = connection.execute("SELECT value FROM meta").fetchone()[0]
+        self.assertEqual(
+            history.history(self.path, "FOO")[0].digest, configvars._digest("pw", salt)
+        )
+
+    def test_salt_differs_between_files(self):
+        other = os.path.join(self.tmpdir, "other.sqlite3")
+        secret = variable(value=configvars.MASKED_SECRET_VALUE, secret=True)
+        for path in (self.path, other):
+            history.record([secret], path, recorded_at=1, secret_digest=digest_of("pw"))
+        self.assertNotEqual(
+            history.history(self.path, "FOO")[0].digest,
+            history.history(other, "FOO")[0].digest,
+        )
+
+    def test_unchanged_secret_is_not_recorded_again(self):
+        secret = variable(value=configvars.MASKED_SECRET_VALUE, secret=True)
+        history.record(
+            [secret], self.path, recorded_at=1, secret_digest=digest_of("pw")
+        )
+        self.assertEqual(
+            history.record(
+                [secret], self.path, recorded_at=2, secret_digest=digest_of("pw")
+            ),
+            0,
+        )
+
+    def test_creates_name_index(self):
+        history.record([variable()], self.path, recorded_at=1)
+        with sqlite3.connect(self.path) as connection:
+            plan = connection.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM changes WHERE name = 'FOO'"
+            ).fetchall()
+        self.assertIn("changes_name_run", str(plan))
+
+    def test_record_in_background_writes_registry(self):
+        cfg = configvars.Config()
+        with temporary_module("histproj.local"):
+            cfg.initialize(local_settings_module="histproj.local")
+        cfg.config("FOO", "one")
+        history.record_in_background(cfg, self.path).join()
+        self.assertEqual(len(history.history(self.path, "FOO")), 1)
+
+    def test_record_in_background_uses_daemon_thread(self):
+        cfg = configvars.Config()
+        with temporary_module("histproj.local"):
+            cfg.initialize(local_settings_module="histproj.local")
+        thread = history.record_in_background(cfg, self.path)
+        thread.join()
+        self.assertTrue(thread.daemon)
+
+    def test_records_for_server_command(self):
+        with patch.dict(sys.modules):
+            sys.modules.pop("pytest", None)
+            self.assertTrue(history.should_record(["manage.py", "runserver"]))
+
+    def test_skips_recording_for_configvars_command(self):
+        with patch.dict(sys.modules):
+            sys.modules.pop("pytest", None)
+            self.assertFalse(
+                history.should_record(["manage.py", "configvars", "history", "FOO"])
+            )
+
+    def test_skips_recording_for_test_command(self):
+        self.assertFalse(history.should_record(["manage.py", "test"]))
+
+    def test_skips_recording_under_pytest(self):
+        with patch.dict(sys.modules, {"pytest": sys}):
+            self.assertFalse(history.should_record(["manage.py", "runserver"]))
+
+    def test_command_prints_history(self):
+        history.record([variable()], self.path, recorded_at=1)
+        with override_settings(CONFIGVARS_HISTORY_FILE=self.path):
+            output = run_command(subcommand="history", name="FOO")
+        self.assertTrue(output.strip().endswith('FOO = "one"  # from env'))
+
+    def test_command_masks_secret_history(self):
+        secret = variable(
+            value=configvars.MASKED_SECRET_VALUE, secret=True, digest="a" * 64
+        )
+        history.record([secret], self.path, recorded_at=1)
+        with override_settings(CONFIGVARS_HISTORY_FILE=self.path):
+            output = run_command(subcommand="history", name="FOO")
+        self.assertIn("<hmac aaaaaaaaaaaa>", output)
+
+    def test_file_is_readable_by_owner_only(self):
+        history.record([variable()], self.path, recorded_at=1)
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o600)
+
+    def test_history_does_not_create_file(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            history.history(self.path, "FOO")
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_command_raises_for_missing_history_file(self):
+        with override_settings(CONFIGVARS_HISTORY_FILE=self.path):
+            with self.assertRaises(CommandError):
+                run_command(subcommand="history", name="FOO")
+
+    def test_record_in_background_keys_secret_with_file_salt(self):
+        cfg = configvars.Config()
+        with temporary_module("histproj.local", TOKEN="s3cret"):
+            cfg.initialize(local_settings_module="histproj.local")
+        cfg.secret("TOKEN")
+        history.record_in_background(cfg, self.path).join()
+        with sqlite3.connect(self.path) as connection:
+            salt = connection.execute("SELECT value FROM meta").fetchone()[0]
+        self.assertEqual(
+            history.history(self.path, "TOKEN")[0].digest,
+            cfg.secret_digest("TOKEN", salt),
+        )
+
+    def test_command_requires_history_file(self):
+        with self.assertRaises(CommandError):
+            run_command(subcommand="history", name="FOO")
@@ -0,0 +1,148 @@
+import hashlib
+import os
+import unittest
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import django
+from django.conf import settings
+from django.test.utils import override_settings
+from test_configvars import secret_file, temporary_module
+
+if not settings.configured:
+    settings.configure(
+        INSTALLED_APPS=["configvars", "configvars.dynamic"],
+        DATABASES={
+            "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+        },
+    )
+    django.setup()
+
+import configvars  # noqa: E402
+from configvars import apps, metrics  # noqa: E402
+
+
+def failing_check(app_configs):
+    return ["failed"]
+
+
+@contextmanager
+def metrics_config(env=None):
+    with temporary_module("metricsproj.local", FOO="local"):
+        with secret_file("s3cret") as path:
+            environ = {"TOKEN_FILE": path, **(env or {})}
+            with patch.dict(os.environ, environ, clear=True):
+                cfg = configvars.Config()
+                cfg.initialize(local_settings_module="metricsproj.local")
+                cfg.config("FOO", "default")
+                cfg.config("BAR", "default")
+                cfg.secret(file_var="TOKEN_FILE")
+                yield cfg
+
+
+def render(cfg, checks=()):
+    return metrics.Metrics(cfg, checks=checks).render().decode()
+
+
+class MetricsTests(unittest.TestCase):
+    def test_reports_registered_variables(self):
+        with metrics_config() as cfg:
+            self.assertIn("configvars_registered_variables 3\n", render(cfg))
+
+    def test_reports_variables_by_source(self):
+        with metrics_config() as cfg:
+            self.assertIn(
+                'configvars_variables_by_source{source="metricsproj.local"} 1\n',
+                render(cfg),
+            )
+
+    def test_reports_secret_file_read_latency(self):
+        with metrics_config() as cfg:
+            self.assertIn(
+                'configvars_secret_file_read_seconds{name="TOKEN_FILE"} ', render(cfg)
+            )
+
+    def test_reports_last_rotation_timestamp(self):
+        with metrics_config() as cfg:
+            mtime = cfg.secret_file_reads()["TOKEN_FILE"][1]
+            self.assertIn(
+                f"configvars_secret_last_rotation_timestamp_seconds {mtime}\n",
+                render(cfg),
+            )
+
+    def test_reports_failed_checks(self):
+        with metrics_config() as cfg:
+            self.assertIn(
+                'configvars_failed_checks{check="failing_check"} 1\n',
+                render(cfg, checks=(failing_check,)),
+            )
+
+    def test_reports_fingerprint(self):
+        with metrics_config() as cfg:
+            self.assertIn(
+                f'configvars_info{{fingerprint="{cfg.fingerprint()}"}} 1\n',
+                render(cfg),
+            )
+
+    @override_settings(CONFIGVARS_FINGERPRINT_KEY="k3y")
+    def test_fingerprint_changes_with_secret_value(self):
+        with metrics_config() as cfg:
+            fingerprint = cfg.fingerprint()
+        with metrics_config({"TOKEN_FILE": ""}) as cfg:
+            self.assertNotEqual(cfg.fingerprint(), fingerprint)
+
+    @override_settings(CONFIGVARS_FINGERPRINT_KEY="k3y")
+    def test_fingerprint_is_stable_between_configs(self):
+        with metrics_config() as cfg:
+            fingerprint = cfg.fingerprint()
+        with metrics_config() as cfg:
+            self.assertEqual(cfg.fingerprint(), fingerprint)
+
+    @override_settings(CONFIGVARS_FINGERPRINT_KEY="k3y")
+    def test_fingerprint_uses_configured_key(self):
+        with metrics_config() as cfg:
+            fingerprint = cfg.fingerprint()
+            with override_settings(CONFIGVARS_FINGERPRINT_KEY="other"):
+                self.assertNotEqual(cfg.fingerprint(), fingerprint)
+
+    def test_fingerprint_without_key_is_keyed_per_config(self):
+        with metrics_config() as cfg:
+            fingerprint = cfg.fingerprint()
+        with metrics_config() as cfg:
+            self.assertNotEqual(cfg.fingerprint(), fingerprint)
+
+    def test_reports_deprecated_names_check(self):
+        self.assertIn(apps.check_deprecated_names, metrics.metrics._checks)
+
+    def test_secret_digest_is_not_plain_hash(self):
+        with metrics_config() as cfg:
+            digest = cfg._all_configvars["TOKEN_FILE"].digest
+            self.assertNotEqual(digest, hashlib.sha256(b"s3cret").hexdigest())
+
+    def test_secret_digest_is_keyed_per_config(self):
+        with metrics_config() as cfg:
+            digest = cfg._all_configvars["TOKEN_FILE"].digest
+        with metrics_config() as cfg:
+            self.assertNotEqual(cfg._all_configvars["TOKEN_FILE"].digest, digest)
+
+    def test_escapes_label_values(self):
+        self.assertEqual(metrics._escape('a"b\\c\nd'), 'a\\"b\\\\c\\nd')
+
+    def test_reuses_rendered_response(self):
+        with metrics_config() as cfg:
+            cached = metrics.Metrics(cfg)
+            cached.render()
+            with patch.object(cached, "_render") as render_mock:
+                cached.render()
+                self.assertFalse(render_mock.called)
+
+    def test_rerenders_after_registration(self):
+        with metrics_config() as cfg:
+            cached = metrics.Metrics(cfg)
+            cached.render()
+            cfg.config("BAZ", 1)
+            self.assertIn(b"configvars_registered_variables 4\n", cached.render())
+
+    def test_view_returns_text_format(self):
+        response = metrics.metrics_view(None)
+        self.assertEqual(response["Content-Type"], metrics.CONTENT_TYPE)
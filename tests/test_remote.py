@@ -0,0 +1,179 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from unittest.mock import patch
+
+from test_configvars import temporary_module
+
+import configvars
+from configvars import remote
+
+KV_DATA = [
+    {"Key": "app/", "Value": None},
+    {"Key": "app/FOO", "Value": base64.b64encode(b"remote").decode()},
+    {"Key": "app/EMPTY", "Value": None},
+]
+
+
+class KVServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), KVHandler)
+        self.requests = []
+        self.connections = set()
+
+
+class KVHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        self.server.requests.append(self.path)
+        self.server.connections.add(self.client_address)
+        body = json.dumps(KV_DATA).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def kv_server():
+    server = KVServer()
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+        remote.pool.clear()
+
+
+def kv_url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}/v1/kv"
+
+
+@contextmanager
+def remote_config(env=None, **local_attrs):
+    with kv_server() as server, temporary_module("remoteproj.local", **local_attrs):
+        provider = remote.HTTPKeyValueProvider(kv_url(server), prefix="app/")
+        with patch.dict(os.environ, env or {}, clear=True):
+            configvars.default_config.initialize(
+                local_settings_module="remoteproj.local", providers=[provider]
+            )
+            yield configvars.default_config
+
+
+class HTTPKeyValueProviderTests(unittest.TestCase):
+    def setUp(self):
+        configvars.default_config._reset_state()
+        self.tmpdir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.tmpdir, "kv.json")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_fetch_strips_prefix(self):
+        with kv_server() as server:
+            provider = remote.HTTPKeyValueProvider(kv_url(server), prefix="app/")
+            self.assertEqual(provider.fetch(), {"FOO": "remote", "EMPTY": None})
+
+    def test_fetch_uses_single_recursive_request(self):
+        with kv_server() as server:
+            remote.HTTPKeyValueProvider(kv_url(server), prefix="app/").fetch()
+            self.assertEqual(server.requests, ["/v1/kv/app/?recurse=true"])
+
+    def test_fetch_uses_memory_cache_within_ttl(self):
+        with kv_server() as server:
+            provider = remote.HTTPKeyValueProvider(kv_url(server), prefix="app/")
+            provider.fetch()
+            provider.fetch()
+            self.assertEqual(len(server.requests), 1)
+
+    def test_refresh_reuses_keep_alive_connection(self):
+        with kv_server() as server:
+            provider = remote.HTTPKeyValueProvider(kv_url(server), prefix="app/")
+            provider.refresh()
+            provider.refresh()
+            self.assertEqual(len(server.connections), 1)
+
+    def test_fetch_writes_cache_file(self):
+        with kv_server() as server:
+            remote.HTTPKeyValueProvider(
+                kv_url(server), prefix="app/", cache_file=self.cache_file
+            ).fetch()
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f)["FOO"], "remote")
+
+    def test_fetch_returns_cache_file_when_server_is_down(self):
+        with open(self.cache_file, "w") as f:
+            json.dump({"FOO": "cached"}, f)
+        provider = remote.HTTPKeyValueProvider(
+            "http://127.0.0.1:9/v1/kv", cache_file=self.cache_file, timeout=1
+        )
+        self.assertEqual(provider.fetch(), {"FOO": "cached"})
+
+    def test_fetch_refreshes_cache_file_in_background(self):
+        with open(self.cache_file, "w") as f:
+            json.dump({"FOO": "cached"}, f)
+        with kv_server() as server:
+            provider = remote.HTTPKeyValueProvider(
+                kv_url(server), prefix="app/", cache_file=self.cache_file
+            )
+            provider.fetch()
+            provider._refresh_thread.join()
+        with open(self.cache_file) as f:
+            self.assertEqual(json.load(f)["FOO"], "remote")
+
+    def test_fetch_raises_without_cache_when_server_is_down(self):
+        provider = remote.HTTPKeyValueProvider("http://127.0.0.1:9/v1/kv", timeout=1)
+        with self.assertRaises(configvars.ImproperlyConfigured):
+            provider.fetch()
+
+    def test_fetch_raises_for_malformed_response(self):
+        provider = remote.HTTPKeyValueProvider("http://127.0.0.1:9/v1/kv")
+        for body in (b'[{"Value": null}]', b"[1]", b'{"Key": "app/FOO"}'):
+            with patch.object(provider, "_request", return_value=body):
+                with self.assertRaises(configvars.ImproperlyConfigured):
+                    provider.refresh()
+
+    def test_refresh_keeps_values_after_malformed_response(self):
+        provider = remote.HTTPKeyValueProvider("http://127.0.0.1:9/v1/kv")
+        provider._values = {"FOO": "cached"}
+        with patch.object(provider, "_request", return_value=b"[1]"):
+            self.assertEqual(provider.refresh(), {"FOO": "cached"})
+
+    def test_config_reads_remote_value(self):
+        with remote_config() as cfg:
+            self.assertEqual(cfg.config("FOO", "default"), "remote")
+
+    def test_config_env_overrides_remote(self):
+        with remote_config({"FOO": "env"}) as cfg:
+            self.assertEqual(cfg.config("FOO", "default"), "env")
+
+    def test_config_local_overrides_remote(self):
+        with remote_config(FOO="local") as cfg:
+            self.assertEqual(cfg.config("FOO", "default"), "local")
+
+    def test_config_registers_remote_source(self):
+        with remote_config() as cfg:
+            cfg.config("FOO")
+            self.assertEqual(list(cfg.config_variables())[0].source, "remote")
+
+    def test_secret_reads_remote_value(self):
+        with remote_config() as cfg:
+            self.assertEqual(cfg.secret("FOO"), "remote")